@@ -0,0 +1,112 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.authentication import TokenAuthentication
+
+from recipes.counters import COUNTERS
+
+USER_COUNTERS_FIELDS = [
+    field_name for model, field_name, *_ in COUNTERS if model == 'users.User'
+]
+
+
+def get_user_tokens_changed_at_key(user_id):
+    """Return shared cache key of user or user tokens change time."""
+    return f'user_tokens_changed_at:{user_id}'
+
+
+def mark_user_tokens_changed(user_id):
+    """
+    Save user or user tokens change time in shared cache, token users
+    cached by any process before it are stale.
+    """
+    cache.set(
+        get_user_tokens_changed_at_key(user_id),
+        time.time_ns(),
+        settings.AUTH_TOKEN_CACHE_TIMEOUT
+    )
+
+
+class TokenCache:
+    """Keep limited number of token users for limited time."""
+
+    def __init__(self, max_size, timeout):
+        self.items = OrderedDict()
+        self.lock = threading.Lock()
+        self.max_size = max_size
+        self.timeout = timeout
+
+    def get(self, key):
+        """
+        Return cached user and token or None if it is missing, expired
+        or loaded before user or user tokens change in any process.
+        """
+        with self.lock:
+            item = self.items.get(key)
+            if item is None:
+                return None
+            expires_at, loaded_at, user, token = item
+            if expires_at < time.monotonic():
+                del self.items[key]
+                return None
+            self.items.move_to_end(key)
+        changed_at = cache.get(get_user_tokens_changed_at_key(user.id))
+        if changed_at is not None and changed_at >= loaded_at:
+            self.delete(key)
+            return None
+        return copy.copy(user), copy.copy(token)
+
+    def set(self, key, user, token, loaded_at):
+        """
+        Cache user without counters and token loaded at loaded_at time,
+        delete least recently used item if full. Counters are deferred
+        fields of cached user copies, they are loaded on access
+        and skipped by save().
+        """
+        user = copy.copy(user)
+        for field_name in USER_COUNTERS_FIELDS:
+            user.__dict__.pop(field_name, None)
+        with self.lock:
+            self.items[key] = (
+                time.monotonic() + self.timeout, loaded_at, user, token
+            )
+            self.items.move_to_end(key)
+            if len(self.items) > self.max_size:
+                self.items.popitem(last=False)
+
+    def delete(self, key):
+        """Delete cached token."""
+        with self.lock:
+            self.items.pop(key, None)
+
+    def delete_user(self, user_id):
+        """Delete cached tokens of user."""
+        with self.lock:
+            for key in [
+                key for key, (*_, user, _) in self.items.items()
+                if user.id == user_id
+            ]:
+                del self.items[key]
+
+
+token_cache = TokenCache(
+    settings.AUTH_TOKEN_CACHE_MAX_SIZE, settings.AUTH_TOKEN_CACHE_TIMEOUT
+)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """Token authentication which caches token users in process memory."""
+
+    def authenticate_credentials(self, key):
+        """Get user and token from cache, query them on cache miss."""
+        cached = token_cache.get(key)
+        if cached is not None:
+            return cached
+        loaded_at = time.time_ns()
+        user, token = super().authenticate_credentials(key)
+        token_cache.set(key, user, token, loaded_at)
+        return token_cache.get(key) or (user, token)
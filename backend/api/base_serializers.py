@@ -1,4 +1,9 @@
+from django.db import IntegrityError
+from django.db.transaction import atomic
+from rest_framework.exceptions import ErrorDetail, ValidationError
 from rest_framework.serializers import ModelSerializer
+from rest_framework.settings import api_settings
+from rest_framework.validators import UniqueTogetherValidator
 
 from recipes.models import Favorite, ShoppingCartRecipe
 from users.models import Follow
@@ -7,18 +12,39 @@ from users.models import Follow
 class GetBoolFieldsSerializer(ModelSerializer):
     """Serializer with get_bool_field_value method."""
 
-    def get_bool_field_value(self, model, current_user, obj):
-        """Get bool value for serializer fields."""
+    related_id_fields = {
+        Favorite: 'recipe_id',
+        Follow: 'following_author_id',
+        ShoppingCartRecipe: 'recipe_id',
+    }
+
+    def get_bool_field_value(self, model, current_user, obj, field_name=None):
+        """
+        Get bool value for serializer fields.
+
+        Return value annotated to instance as field_name if it exists.
+        """
         if not current_user.is_authenticated:
             return False
-        if model == Favorite or model == ShoppingCartRecipe:
-            return model.objects.filter(
-                recipe=obj, user=current_user
-            ).exists()
-        if model == Follow:
-            return model.objects.filter(
-                following_author=obj, user=current_user
-            ).exists()
+        if field_name is not None and hasattr(obj, field_name):
+            return getattr(obj, field_name)
+        return obj.id in self.get_related_ids(model, current_user)
+
+    def get_related_ids(self, model, current_user):
+        """
+        Get ids of recipes or authors related to current user by model,
+        load them once per request.
+        """
+        request = self.context.get('request')
+        if not hasattr(request, 'related_ids'):
+            request.related_ids = {}
+        if model not in request.related_ids:
+            request.related_ids[model] = set(
+                model.objects.filter(user=current_user).values_list(
+                    self.related_id_fields[model], flat=True
+                )
+            )
+        return request.related_ids[model]
 
 
 class ToRepresentationSerializer(ModelSerializer):
@@ -29,3 +55,24 @@ class ToRepresentationSerializer(ModelSerializer):
         return serializer(
             instance, context={'request': self.context.get('request')}
         ).data
+
+
+class UniqueConstraintCreateSerializer(ToRepresentationSerializer):
+    """
+    Serializer creating instance by one INSERT without uniqueness check,
+    database unique constraint violation is returned as validation error.
+    """
+
+    def create(self, validated_data):
+        try:
+            with atomic():
+                return super().create(validated_data)
+        except IntegrityError:
+            raise ValidationError({api_settings.NON_FIELD_ERRORS_KEY: [
+                ErrorDetail(
+                    str(UniqueTogetherValidator.message).format(
+                        field_names=', '.join(self.Meta.fields)
+                    ),
+                    code='unique'
+                )
+            ]})
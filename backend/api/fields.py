@@ -0,0 +1,32 @@
+from django.conf import settings
+from django.core.files.storage import default_storage
+from rest_framework import serializers
+
+from recipes.images import get_rendition_name, submit_renditions
+
+
+class RecipeImageField(serializers.ImageField):
+    """
+    Return URL of recipe image rendition for image_size query parameter,
+    URL of original image otherwise or until rendition is created.
+    """
+
+    def __init__(self, **kwargs):
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        request = self.context.get('request')
+        size = request and request.query_params.get(
+            settings.IMAGE_SIZE_QUERY_PARAMETER_NAME
+        )
+        if not value or size not in settings.RECIPE_IMAGE_SIZES:
+            return super().to_representation(value)
+        has_image_renditions = value.instance.has_image_renditions
+        if has_image_renditions is None:
+            submit_renditions(value.name)
+        if not has_image_renditions:
+            return super().to_representation(value)
+        return request.build_absolute_uri(
+            default_storage.url(get_rendition_name(value.name, size))
+        )
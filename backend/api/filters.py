@@ -1,7 +1,27 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Case, F, When
 from django_filters.rest_framework import filters, FilterSet
 from rest_framework.filters import SearchFilter
 
-from recipes.models import Recipe
+from recipes.indexes import ingredient_recipe_index
+from recipes.models import Recipe, Tag
+from recipes.search import search_recipes
+from recipes.utils import get_cache_version, get_tags_mask
+
+
+def get_tags_ids():
+    """Return tags ids by slugs, cache it until Tag changes."""
+    return cache.get_or_set(
+        f'tags_ids:{get_cache_version(Tag)}',
+        lambda: dict(Tag.objects.values_list('slug', 'id')),
+        settings.CACHE_TIMEOUT
+    )
+
+
+def get_tags_choices():
+    """Return choices for tags filter."""
+    return [(slug, slug) for slug in get_tags_ids()]
 
 
 class IngredientFilter(SearchFilter):
@@ -10,25 +30,97 @@ class IngredientFilter(SearchFilter):
     search_param = 'name'
 
 
+class NumberInFilter(filters.BaseInFilter, filters.NumberFilter):
+    """Filter by comma separated numbers."""
+
+
 class RecipeFilter(FilterSet):
     """Describe filter class for RecipeViewSet."""
 
+    ingredients = NumberInFilter(method='filter_ingredients_recipes')
     is_favorited = filters.BooleanFilter(
         method='filter_favorite_recipes'
     )
     is_in_shopping_cart = filters.BooleanFilter(
         method='filter_shopping_cart_recipes'
     )
-    tags = filters.AllValuesMultipleFilter(
-        field_name='tags__slug',
+    ordering = filters.ChoiceFilter(
+        choices=((settings.POPULAR_ORDERING, 'По популярности'),),
+        method='order_recipes'
+    )
+    search = filters.CharFilter(method='search_recipes')
+    tags = filters.MultipleChoiceFilter(
+        choices=get_tags_choices, method='filter_tags_recipes'
     )
 
     class Meta:
         model = Recipe
         fields = (
-            'author', 'is_favorited', 'is_in_shopping_cart', 'tags'
+            'author',
+            'ingredients',
+            'is_favorited',
+            'is_in_shopping_cart',
+            'ordering',
+            'search',
+            'tags',
         )
 
+    def filter_queryset(self, queryset):
+        """
+        Apply ingredients filter after others, so its limited
+        results are searched among recipes matching other filters.
+        """
+        for name, value in sorted(
+            self.form.cleaned_data.items(),
+            key=lambda item: item[0] == 'ingredients'
+        ):
+            queryset = self.filters[name].filter(queryset, value)
+        return queryset
+
+    def filter_ingredients_recipes(self, queryset, name, value):
+        """
+        Get recipes with requested ingredients among filtered recipes
+        ordered by share of recipe ingredients found.
+        """
+        ingredients_ids = [int(ingredient_id) for ingredient_id in value]
+        limit = settings.INGREDIENTS_SEARCH_LIMIT
+        if queryset.query.where:
+            recipes_ids = self.get_filtered_recipes_ids(
+                queryset,
+                ingredient_recipe_index.search(ingredients_ids),
+                limit
+            )
+        else:
+            recipes_ids = ingredient_recipe_index.search(
+                ingredients_ids, limit
+            )
+        if not recipes_ids:
+            return queryset.none()
+        return queryset.filter(id__in=recipes_ids).order_by(Case(*(
+            When(id=recipe_id, then=position)
+            for position, recipe_id in enumerate(recipes_ids)
+        )))
+
+    @staticmethod
+    def get_filtered_recipes_ids(queryset, recipes_ids, limit):
+        """
+        Return first limit of ordered recipes ids matching queryset,
+        check them in batches growing twice instead of loading
+        ids of all filtered recipes.
+        """
+        found_ids = []
+        start, batch_size = 0, limit
+        while start < len(recipes_ids) and len(found_ids) < limit:
+            batch = recipes_ids[start:start + batch_size]
+            matching_ids = set(queryset.filter(id__in=batch).order_by(
+            ).values_list('id', flat=True))
+            found_ids.extend(
+                recipe_id for recipe_id in batch if recipe_id in matching_ids
+            )
+            start += batch_size
+            batch_size *= 2
+        return found_ids[:limit]
+
     def filter_favorite_recipes(self, queryset, name, value):
         """Get favorite recipes of request user."""
         user = self.request.user
@@ -42,3 +134,29 @@ class RecipeFilter(FilterSet):
         if value and user.is_authenticated:
             return queryset.filter(shopping_cart_recipes__user=user)
         return queryset
+
+    def filter_tags_recipes(self, queryset, name, value):
+        """
+        Get recipes with any of requested tags by tags bitmask,
+        use join with tags if some tag id does not fit in bitmask.
+        """
+        tags_ids = get_tags_ids()
+        tags_ids = [tags_ids[slug] for slug in value if slug in tags_ids]
+        if not tags_ids:
+            return queryset
+        if max(tags_ids) > settings.TAGS_MASK_MAX_TAG_ID:
+            return queryset.filter(tags__id__in=tags_ids).distinct()
+        return queryset.alias(
+            tags_match=F('tags_mask').bitand(get_tags_mask(tags_ids))
+        ).exclude(tags_match=0)
+
+    def order_recipes(self, queryset, name, value):
+        """Order recipes by precomputed popularity score."""
+        return queryset.order_by(
+            F('popularity__score').desc(nulls_last=True),
+            *queryset.model._meta.ordering
+        )
+
+    def search_recipes(self, queryset, name, value):
+        """Get recipes found by name and text, ordered by rank."""
+        return search_recipes(queryset, value)
@@ -0,0 +1,183 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+
+class Histogram:
+    """Aggregate per action metrics values into fixed buckets."""
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.lock = threading.Lock()
+        self.metrics = {}
+
+    def add(self, action, values):
+        """Add metrics values of one request of action."""
+        with self.lock:
+            action_metrics = self.metrics.setdefault(action, {})
+            for metric, value in values.items():
+                count, total, buckets = action_metrics.get(
+                    metric, (0, 0, [0] * (len(self.bounds) + 1))
+                )
+                buckets[bisect_left(self.bounds, value)] += 1
+                action_metrics[metric] = (count + 1, total + value, buckets)
+
+    def clear(self):
+        """Delete all collected values."""
+        with self.lock:
+            self.metrics.clear()
+
+    def dump(self):
+        """Return collected values, buckets are keyed by upper bounds."""
+        with self.lock:
+            return {
+                action: {
+                    metric: {
+                        'count': count,
+                        'sum': round(total, 3),
+                        'buckets': dict(zip(
+                            [*map(str, self.bounds), '+Inf'], buckets
+                        )),
+                    }
+                    for metric, (count, total, buckets) in metrics.items()
+                }
+                for action, metrics in sorted(self.metrics.items())
+            }
+
+
+histogram = Histogram(settings.INSTRUMENTATION_HISTOGRAM_BOUNDS)
+
+
+class QueryTimer:
+    """Count database queries and their duration."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+
+
+class TimedDataMixin:
+    """Add time of data serialization except db time to request metrics."""
+
+    @property
+    def data(self):
+        instrumentation = getattr(
+            self.context.get('request'), 'instrumentation', None
+        )
+        if instrumentation is None:
+            return super().data
+        query_timer = instrumentation['query_timer']
+        start, db_start = time.perf_counter(), query_timer.duration
+        try:
+            return super().data
+        finally:
+            instrumentation['serializer'] += (
+                time.perf_counter() - start - query_timer.duration + db_start
+            )
+
+
+timed_serializer_classes = {}
+
+
+def time_serializer(serializer):
+    """Make serializer instance time its data serialization."""
+    if not settings.INSTRUMENTATION_ENABLED:
+        return serializer
+    serializer_class = type(serializer)
+    if serializer_class not in timed_serializer_classes:
+        timed_serializer_classes[serializer_class] = type(
+            serializer_class.__name__, (TimedDataMixin, serializer_class), {}
+        )
+    serializer.__class__ = timed_serializer_classes[serializer_class]
+    return serializer
+
+
+class TimedSerializerMixin:
+    """Time data serialization of view serializers."""
+
+    def get_serializer(self, *args, **kwargs):
+        return time_serializer(super().get_serializer(*args, **kwargs))
+
+
+def get_view_action(request, view_func):
+    """Return view action name like RecipeViewSet.list."""
+    view_class = getattr(view_func, 'cls', None)
+    if view_class is None:
+        return view_func.__name__
+    action = getattr(view_func, 'actions', {}).get(request.method.lower())
+    if action is None:
+        return view_class.__name__
+    return f'{view_class.__name__}.{action}'
+
+
+class InstrumentationMiddleware:
+    """
+    Measure query count, db, view, serializer and render time
+    of API requests, add them to Server-Timing header and histogram.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        query_timer = QueryTimer()
+        request.instrumentation = {
+            'action': None,
+            'query_timer': query_timer,
+            'serializer': 0,
+            'view_end': None,
+        }
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(query_timer))
+            response = self.get_response(request)
+        end = time.perf_counter()
+        action = request.instrumentation['action']
+        if action is None:
+            return response
+        view_end = request.instrumentation['view_end'] or end
+        values = {
+            'db': query_timer.duration * 1000,
+            'queries': query_timer.count,
+            'render': (end - view_end) * 1000,
+            'serializer': request.instrumentation['serializer'] * 1000,
+            'total': (end - start) * 1000,
+        }
+        values['app'] = max(
+            values['total'] - values['render'] - values['db']
+            - values['serializer'],
+            0
+        )
+        histogram.add(action, values)
+        response['Server-Timing'] = ', '.join((
+            f'app;dur={values["app"]:.1f}',
+            f'db;dur={values["db"]:.1f};desc="{query_timer.count} queries"',
+            f'render;dur={values["render"]:.1f}',
+            f'serializer;dur={values["serializer"]:.1f}',
+            f'total;dur={values["total"]:.1f}',
+        ))
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        """Save name of action processing request."""
+        request.instrumentation['action'] = get_view_action(
+            request, view_func
+        )
+
+    def process_template_response(self, request, response):
+        """Save time of view end, response rendering starts after it."""
+        request.instrumentation['view_end'] = time.perf_counter()
+        return response
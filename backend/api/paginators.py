@@ -1,16 +1,170 @@
+import json
+from hashlib import md5
+
 from django.conf import settings
-from rest_framework.pagination import PageNumberPagination
+from django.core.cache import cache
+from django.core.paginator import EmptyPage, Page, PageNotAnInteger, Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+
+class ApproximateCountPage(Page):
+    """Page which knows if next page exists by fetched extra row."""
+
+    def __init__(self, object_list, number, paginator, has_next):
+        super().__init__(object_list, number, paginator)
+        self._has_next = has_next
+
+    def has_next(self):
+        return self._has_next
+
+
+class ApproximateCountPaginator(Paginator):
+    """
+    Paginator which count is only reported in response, pages are sliced
+    by page number without limiting them by count, which may be stale
+    or estimated lower than real one.
+    """
+
+    def validate_number(self, number):
+        """Check that page number is positive integer only."""
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger(_('That page number is not an integer'))
+        if number < 1:
+            raise EmptyPage(_('That page number is less than 1'))
+        return number
+
+    def page(self, number):
+        """Return page sliced by number, fetch one extra object for next."""
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        object_list = list(
+            self.object_list[bottom:bottom + self.per_page + 1]
+        )
+        if not object_list and number > 1:
+            raise EmptyPage(_('That page contains no results'))
+        return ApproximateCountPage(
+            object_list[:self.per_page],
+            number,
+            self,
+            len(object_list) > self.per_page
+        )
+
+
+class CachedCountPaginator(ApproximateCountPaginator):
+    """Paginator with exact count cached by query for a short time."""
+
+    @cached_property
+    def count(self):
+        sql, params = self.object_list.query.sql_with_params()
+        cache_key = 'pagination_count:{}'.format(
+            md5(f'{sql}{params}'.encode()).hexdigest()
+        )
+        count = cache.get(cache_key)
+        if count is None:
+            count = super().count
+            cache.set(
+                cache_key, count, settings.PAGINATION_COUNT_CACHE_TIMEOUT
+            )
+        return count
+
+
+class EstimatedCountPaginator(ApproximateCountPaginator):
+    """
+    Paginator with count estimated by PostgreSQL planner statistics,
+    exact count is used for other databases.
+    """
+
+    @cached_property
+    def count(self):
+        connection = connections[self.object_list.db]
+        if connection.vendor != 'postgresql':
+            return super().count
+        sql, params = self.object_list.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return plan[0]['Plan']['Plan Rows']
 
 
-class RecipesPagination(PageNumberPagination):
-    """Pagination for Recipe instances views."""
+class CountModePaginationMixin:
+    """Choose paginator count mode by query parameter."""
 
+    count_paginator_classes = {
+        settings.CACHED_COUNT_MODE: CachedCountPaginator,
+        settings.ESTIMATED_COUNT_MODE: EstimatedCountPaginator,
+    }
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.django_paginator_class = self.count_paginator_classes.get(
+            request.query_params.get(
+                settings.COUNT_MODE_QUERY_PARAMETER_NAME
+            ),
+            Paginator
+        )
+        return super().paginate_queryset(queryset, request, view)
+
+
+class RecipesCursorPagination(CursorPagination):
+    """
+    Cursor pagination for Recipe instances views by creation time.
+
+    Querysets ordered by filters, e.g. by popularity, search rank
+    or ingredients coverage, are rejected, cursor could not continue
+    their ordering.
+    """
+
+    ordering = ('-created_at', '-id')
     page_size = settings.RECIPES_PAGE_SIZE
     page_size_query_param = settings.QUERY_PARAMETER_NAME
     max_page_size = settings.MAX_PAGE_SIZE
 
+    def paginate_queryset(self, queryset, request, view=None):
+        if queryset.query.order_by:
+            raise ValidationError({
+                settings.PAGINATION_MODE_QUERY_PARAMETER_NAME: [
+                    settings.CURSOR_PAGINATION_WITH_ORDERING
+                ]
+            })
+        return super().paginate_queryset(queryset, request, view)
+
+
+class RecipesPagination(CountModePaginationMixin, PageNumberPagination):
+    """
+    Pagination for Recipe instances views.
+
+    Switch to cursor pagination by pagination mode query parameter.
+    """
+
+    page_size = settings.RECIPES_PAGE_SIZE
+    page_size_query_param = settings.QUERY_PARAMETER_NAME
+    max_page_size = settings.MAX_PAGE_SIZE
+    cursor_paginator = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if request.query_params.get(
+            settings.PAGINATION_MODE_QUERY_PARAMETER_NAME
+        ) == settings.CURSOR_PAGINATION_MODE:
+            self.cursor_paginator = RecipesCursorPagination()
+            return self.cursor_paginator.paginate_queryset(
+                queryset, request, view
+            )
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
 
-class UsersPagination(PageNumberPagination):
+class UsersPagination(CountModePaginationMixin, PageNumberPagination):
     """Pagination for User instances views."""
 
     page_size = settings.USERS_PAGE_SIZE
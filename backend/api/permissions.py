@@ -8,5 +8,5 @@ class IsAuthor(BasePermission):
         return (
             request.method in SAFE_METHODS
             or request.user.is_authenticated
-            and request.user == obj.author
+            and request.user.id == obj.author_id
         )
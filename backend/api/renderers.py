@@ -1,5 +1,3 @@
-import io
-
 from django.conf import settings
 from rest_framework.renderers import BaseRenderer
 
@@ -11,30 +9,28 @@ class TextShoppingCartRenderer(BaseRenderer):
     format = 'txt'
 
     @staticmethod
-    def format_ingredients_data(data: list[dict]):
-        """Return numerated and formatted ingredients data."""
-        return [
-            {
+    def format_ingredients_data(data):
+        """Yield numerated and formatted ingredients data."""
+        for number, obj in enumerate(data, start=1):
+            yield {
                 'number': f'{number}.',
-                'name': obj.get('ingredients__name').capitalize(),
+                'name': obj.get('ingredient__name').capitalize(),
                 'measurement_unit':
-                f'({obj.get("ingredients__measurement_unit")})',
+                f'({obj.get("ingredient__measurement_unit")})',
                 'amount': f'— {obj.get("amount")}'
             }
-            for number, obj in enumerate(data, start=1)
-        ]
+
+    @staticmethod
+    def render_lines(data):
+        """Yield .txt file lines one by one."""
+        yield ' '.join(
+            header for header in settings.SHOPPING_CART_FILE_HEADERS
+        ) + '\n\n'
+        for ingredient_data in data:
+            yield ' '.join(
+                str(sd) for sd in ingredient_data.values()
+            ) + '\n'
 
     def render(self, data, accepted_media_type=None, renderer_context=None):
         """Write ingredients data into .txt file."""
-        text_buffer = io.StringIO()
-        text_buffer.write(
-            ' '.join(
-                header for header in settings.SHOPPING_CART_FILE_HEADERS
-            ) + '\n\n'
-        )
-        for ingredient_data in data:
-            text_buffer.write(
-                ' '.join(str(sd) for sd in list(ingredient_data.values()))
-                + '\n'
-            )
-        return text_buffer.getvalue()
+        return ''.join(self.render_lines(data))
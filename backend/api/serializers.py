@@ -4,12 +4,16 @@ from django.db.transaction import atomic
 from djoser.serializers import TokenCreateSerializer
 from drf_extra_fields.fields import Base64ImageField
 from rest_framework import serializers
-from rest_framework.validators import UniqueTogetherValidator
 
 from api.base_serializers import (
-    GetBoolFieldsSerializer, ToRepresentationSerializer
+    GetBoolFieldsSerializer,
+    ToRepresentationSerializer,
+    UniqueConstraintCreateSerializer,
 )
+from api.fields import RecipeImageField
 from api.validators import SelfSubscriptionValidator
+from recipes.images import schedule_renditions
+from recipes.indexes import record_recipes_changes
 from recipes.models import (
     Favorite,
     Ingredient,
@@ -18,6 +22,7 @@ from recipes.models import (
     ShoppingCartRecipe,
     Tag,
 )
+from recipes.utils import get_tags_mask
 from recipes.validators import validate_ingredient_amount
 from users.models import Follow, User
 
@@ -33,18 +38,12 @@ class AuthTokenCreateSerializer(TokenCreateSerializer):
     )
 
 
-class CreateFavoriteSerializer(ToRepresentationSerializer):
+class CreateFavoriteSerializer(UniqueConstraintCreateSerializer):
     """Create and delete Favorite instances."""
 
     class Meta:
         model = Favorite
         fields = ('recipe', 'user')
-        validators = [
-            UniqueTogetherValidator(
-                queryset=Favorite.objects.all(),
-                fields=('recipe', 'user')
-            )
-        ]
 
     def to_representation(self, instance):
         return super().to_representation(
@@ -52,18 +51,12 @@ class CreateFavoriteSerializer(ToRepresentationSerializer):
         )
 
 
-class CreateShoppingCartRecipeSerializer(ToRepresentationSerializer):
+class CreateShoppingCartRecipeSerializer(UniqueConstraintCreateSerializer):
     """Create ShoppingCartRecipe instances."""
 
     class Meta:
         model = ShoppingCartRecipe
         fields = ('recipe', 'user')
-        validators = [
-            UniqueTogetherValidator(
-                queryset=ShoppingCartRecipe.objects.all(),
-                fields=('recipe', 'user')
-            )
-        ]
 
     def to_representation(self, instance):
         return super().to_representation(
@@ -74,7 +67,7 @@ class CreateShoppingCartRecipeSerializer(ToRepresentationSerializer):
 class FavoriteShoppingCartRecipeSerializer(serializers.ModelSerializer):
     """Process get Favorite and ShoppingCartRecipe instances."""
 
-    image = Base64ImageField()
+    image = RecipeImageField()
 
     class Meta:
         model = Recipe
@@ -102,6 +95,33 @@ class IngredientRecipeSerializer(serializers.ModelSerializer):
         fields = ('id', 'amount')
 
 
+class RecipesIdsSerializer(serializers.Serializer):
+    """Process list of recipes ids for bulk methods."""
+
+    recipes = serializers.ListField(
+        allow_empty=False,
+        child=serializers.IntegerField(min_value=1),
+        max_length=settings.BULK_RECIPES_MAX_COUNT
+    )
+
+    def validate_recipes(self, recipes_ids):
+        """Return requested recipes, error if some of them do not exist."""
+        recipes_ids = list(dict.fromkeys(recipes_ids))
+        recipes = Recipe.objects.only(
+            'id', 'cooking_time', 'has_image_renditions', 'image', 'name'
+        ).in_bulk(recipes_ids)
+        missing_ids = [
+            recipe_id for recipe_id in recipes_ids if recipe_id not in recipes
+        ]
+        if missing_ids:
+            raise serializers.ValidationError(
+                settings.BULK_RECIPES_DO_NOT_EXIST.format(
+                    ids=', '.join(map(str, missing_ids))
+                )
+            )
+        return [recipes[recipe_id] for recipe_id in recipes_ids]
+
+
 class TagSerializer(serializers.ModelSerializer):
     """Process get list of Tag instances and get one's detail."""
 
@@ -178,21 +198,17 @@ class UserSerializer(GetBoolFieldsSerializer):
         to requested user, False otherwise.
         """
         return self.get_bool_field_value(
-            Follow, self.context.get('request').user, obj
+            Follow, self.context.get('request').user, obj, 'is_subscribed'
         )
 
 
-class CreateFollowSerializer(ToRepresentationSerializer):
+class CreateFollowSerializer(UniqueConstraintCreateSerializer):
     """Create Follow instances."""
 
     class Meta:
         model = Follow
         fields = ('following_author', 'user')
         validators = [
-            UniqueTogetherValidator(
-                queryset=Follow.objects.all(),
-                fields=('following_author', 'user')
-            ),
             SelfSubscriptionValidator(
                 fields=('following_author', 'user')
             )
@@ -209,20 +225,24 @@ class FollowSerializer(UserSerializer):
     """Process get, create and delete methods with Follow instances."""
 
     recipes = serializers.SerializerMethodField()
-    recipes_count = serializers.ReadOnlyField(
-        source='recipes.count'
-    )
 
     class Meta(UserSerializer.Meta):
         fields = UserSerializer.Meta.fields + ('recipes', 'recipes_count')
         read_only_fields = UserSerializer.Meta.fields
 
     def get_recipes(self, obj):
-        """Get recipes of following author."""
-        recipes = obj.recipes.all()
-        recipes_limit = self.context.get('request').GET.get('recipes_limit')
-        if recipes_limit and recipes_limit.isdigit():
-            recipes = recipes[:int(recipes_limit)]
+        """
+        Get recipes of following author,
+        use recipes loaded to author_recipes attribute if it exists.
+        """
+        recipes = getattr(obj, 'author_recipes', None)
+        if recipes is None:
+            recipes = obj.recipes.all()
+            recipes_limit = self.context.get('request').GET.get(
+                'recipes_limit'
+            )
+            if recipes_limit and recipes_limit.isdigit():
+                recipes = recipes[:int(recipes_limit)]
         serializer = FavoriteShoppingCartRecipeSerializer(
             recipes,
             context={'request': self.context.get('request')},
@@ -250,7 +270,7 @@ class RecipeReadSerializer(GetBoolFieldsSerializer):
     """Process safety methods with Recipe instances."""
 
     author = UserSerializer(read_only=True)
-    image = Base64ImageField()
+    image = RecipeImageField()
     ingredients = IngredientRecipeReadSerializer(
         many=True, read_only=True, source='ingredients_recipes'
     )
@@ -279,7 +299,7 @@ class RecipeReadSerializer(GetBoolFieldsSerializer):
         to favorites, False otherwise.
         """
         return self.get_bool_field_value(
-            Favorite, self.context.get('request').user, obj
+            Favorite, self.context.get('request').user, obj, 'is_favorited'
         )
 
     def get_is_in_shopping_cart(self, obj):
@@ -288,7 +308,10 @@ class RecipeReadSerializer(GetBoolFieldsSerializer):
         to shopping cart, False otherwise.
         """
         return self.get_bool_field_value(
-            ShoppingCartRecipe, self.context.get('request').user, obj
+            ShoppingCartRecipe,
+            self.context.get('request').user,
+            obj,
+            'is_in_shopping_cart'
         )
 
 
@@ -376,24 +399,69 @@ class RecipeSerializer(ToRepresentationSerializer):
                 for ingredient in ingredients
             ]
         )
+        record_recipes_changes([recipe.id])
+
+    def update_recipe_ingredients(self, ingredients, recipe):
+        """
+        Delete, update and create only changed IngredientRecipe instances.
+        """
+        recipe_ingredients = {
+            recipe_ingredient.ingredient_id: recipe_ingredient
+            for recipe_ingredient in recipe.ingredients_recipes.all()
+        }
+        amounts = {
+            ingredient.get('id').id: ingredient.get('amount')
+            for ingredient in ingredients
+        }
+        deleted_ids = recipe_ingredients.keys() - amounts.keys()
+        if deleted_ids:
+            IngredientRecipe.objects.filter(
+                ingredient_id__in=deleted_ids, recipe=recipe
+            ).delete()
+            record_recipes_changes([recipe.id])
+        changed_recipe_ingredients = []
+        for ingredient_id, amount in amounts.items():
+            recipe_ingredient = recipe_ingredients.get(ingredient_id)
+            if recipe_ingredient and recipe_ingredient.amount != amount:
+                recipe_ingredient.amount = amount
+                changed_recipe_ingredients.append(recipe_ingredient)
+        IngredientRecipe.objects.bulk_update(
+            changed_recipe_ingredients, ['amount']
+        )
+        new_ingredients = [
+            ingredient for ingredient in ingredients
+            if ingredient.get('id').id not in recipe_ingredients
+        ]
+        if new_ingredients:
+            self.create_recipe_ingredients(new_ingredients, recipe)
 
     @atomic
     def create(self, validated_data):
         ingredients = validated_data.pop('ingredients')
         tags = validated_data.pop('tags')
-        recipe = Recipe.objects.create(**validated_data)
+        recipe = Recipe.objects.create(
+            tags_mask=get_tags_mask(tag.id for tag in tags), **validated_data
+        )
         recipe.tags.set(tags)
         self.create_recipe_ingredients(ingredients, recipe)
+        schedule_renditions(recipe.image.name)
         return recipe
 
     @atomic
     def update(self, instance, validated_data):
         ingredients = validated_data.pop('ingredients')
         tags = validated_data.pop('tags')
-        IngredientRecipe.objects.filter(recipe=instance).delete()
-        self.create_recipe_ingredients(ingredients, instance)
+        self.update_recipe_ingredients(ingredients, instance)
         instance.tags.set(tags)
-        return super().update(instance, validated_data)
+        instance.tags_mask = get_tags_mask(tag.id for tag in tags)
+        if 'image' in validated_data:
+            validated_data['has_image_renditions'] = None
+        for field_name, value in validated_data.items():
+            setattr(instance, field_name, value)
+        instance.save(update_fields=[*validated_data, 'tags_mask'])
+        if 'image' in validated_data:
+            schedule_renditions(instance.image.name)
+        return instance
 
     def to_representation(self, instance):
         return super().to_representation(instance, RecipeReadSerializer)
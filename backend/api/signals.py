@@ -0,0 +1,35 @@
+from django.db.models.signals import post_delete, post_save
+from django.db.transaction import on_commit
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from api.authentication import mark_user_tokens_changed, token_cache
+from users.models import User
+
+
+@receiver(post_delete, sender=Token)
+def invalidate_cached_token(sender, instance, **kwargs):
+    """
+    Delete token from cache after its deletion is committed, e.g. on logout,
+    mark user tokens changed for other processes.
+    """
+    key, user_id = instance.key, instance.user_id
+
+    def invalidate():
+        token_cache.delete(key)
+        mark_user_tokens_changed(user_id)
+
+    on_commit(invalidate)
+
+
+@receiver(post_save, sender=User)
+def invalidate_cached_user_tokens(sender, instance, **kwargs):
+    """
+    Delete user tokens from cache after user changes are committed,
+    e.g. password, mark user tokens changed for other processes.
+    """
+    def invalidate():
+        token_cache.delete_user(instance.id)
+        mark_user_tokens_changed(instance.id)
+
+    on_commit(invalidate)
@@ -0,0 +1,51 @@
+from django.core.cache import cache
+from django.test import override_settings, TestCase
+from rest_framework.test import APIClient
+
+from api.authentication import token_cache
+from users.models import User
+
+
+@override_settings(CACHES={
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}
+})
+class CachedTokenAuthenticationTest(TestCase):
+    """Check that cached token users are dropped by every process."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            email='user@example.com',
+            first_name='Имя',
+            last_name='Фамилия',
+            password='Secret-pass-42',
+            username='user',
+        )
+
+    def setUp(self):
+        cache.clear()
+        token_cache.items.clear()
+        self.client = APIClient()
+        response = self.client.post('/api/auth/token/login/', {
+            'email': 'user@example.com', 'password': 'Secret-pass-42',
+        })
+        self.key = response.data['auth_token']
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.key}')
+        self.assertEqual(self.client.get('/api/users/me/').status_code, 200)
+        # Entry of the same token cached by another process.
+        self.other_process_item = token_cache.items[self.key]
+
+    def test_logout(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/auth/token/logout/')
+        self.assertEqual(response.status_code, 204)
+        self.assertNotIn(self.key, token_cache.items)
+        token_cache.items[self.key] = self.other_process_item
+        self.assertEqual(self.client.get('/api/users/me/').status_code, 401)
+
+    def test_user_change(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            User.objects.get(id=self.user.id).save()
+        self.assertNotIn(self.key, token_cache.items)
+        token_cache.items[self.key] = self.other_process_item
+        self.assertIsNone(token_cache.get(self.key))
@@ -0,0 +1,143 @@
+from django.db import transaction
+from django.db.models.signals import pre_delete
+from django.test import override_settings, TestCase
+from rest_framework.test import APIClient
+
+from recipes.models import Favorite, Recipe, ShoppingCartRecipe
+from users.models import Follow, User
+
+
+class UserDeletionError(Exception):
+    """Error raised to interrupt user deletion."""
+
+
+def interrupt_user_deletion(sender, instance, **kwargs):
+    raise UserDeletionError
+
+
+@override_settings(CACHES={
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}
+})
+class CountersTest(TestCase):
+    """Check counters after rows creation and deletion."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author, cls.user = (
+            User.objects.create_user(
+                email=f'{username}@example.com',
+                first_name='Имя',
+                last_name='Фамилия',
+                password='password',
+                username=username,
+            )
+            for username in ('author', 'user')
+        )
+        cls.recipes = [
+            Recipe.objects.create(
+                author=cls.author,
+                cooking_time=10,
+                image='recipes/images/test.png',
+                name=f'Рецепт {number}',
+                text='Описание',
+            )
+            for number in range(3)
+        ]
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def assertCounters(self, recipe, favorites_count, shopping_cart_count):
+        recipe.refresh_from_db()
+        self.assertEqual(
+            (recipe.favorites_count, recipe.shopping_cart_count),
+            (favorites_count, shopping_cart_count)
+        )
+
+    def assertUserCounters(self, user, recipes_count, subscribers_count):
+        user.refresh_from_db()
+        self.assertEqual(
+            (user.recipes_count, user.subscribers_count),
+            (recipes_count, subscribers_count)
+        )
+
+    def test_recipe_actions(self):
+        recipe = self.recipes[0]
+        for url_path, count in (
+            ('favorite', (1, 0)),
+            ('shopping_cart', (1, 1)),
+        ):
+            with self.subTest(url_path=url_path):
+                response = self.client.post(
+                    f'/api/recipes/{recipe.id}/{url_path}/'
+                )
+                self.assertEqual(response.status_code, 201)
+                self.assertCounters(recipe, *count)
+        for url_path, count in (
+            ('favorite', (0, 1)),
+            ('shopping_cart', (0, 0)),
+        ):
+            with self.subTest(url_path=url_path):
+                response = self.client.delete(
+                    f'/api/recipes/{recipe.id}/{url_path}/'
+                )
+                self.assertEqual(response.status_code, 204)
+                self.assertCounters(recipe, *count)
+
+    def test_bulk_recipe_actions(self):
+        recipes_ids = [recipe.id for recipe in self.recipes]
+        for url_path in ('favorite', 'shopping_cart'):
+            with self.subTest(url_path=url_path):
+                response = self.client.post(
+                    f'/api/recipes/{url_path}/',
+                    {'recipes': recipes_ids},
+                    format='json'
+                )
+                self.assertEqual(response.status_code, 201)
+        for recipe in self.recipes:
+            self.assertCounters(recipe, 1, 1)
+        response = self.client.delete(
+            '/api/recipes/favorite/',
+            {'recipes': recipes_ids[:2]},
+            format='json'
+        )
+        self.assertEqual(response.status_code, 204)
+        self.assertCounters(self.recipes[0], 0, 1)
+        self.assertCounters(self.recipes[2], 1, 1)
+
+    def test_subscribe(self):
+        url = f'/api/users/{self.author.id}/subscribe/'
+        self.assertEqual(self.client.post(url).status_code, 201)
+        self.assertUserCounters(self.author, 3, 1)
+        self.assertEqual(self.client.delete(url).status_code, 204)
+        self.assertUserCounters(self.author, 3, 0)
+
+    def test_recipe_deletion(self):
+        self.client.force_authenticate(self.author)
+        response = self.client.delete(f'/api/recipes/{self.recipes[0].id}/')
+        self.assertEqual(response.status_code, 204)
+        self.assertUserCounters(self.author, 2, 0)
+
+    def test_user_deletion(self):
+        recipe = self.recipes[0]
+        Favorite.objects.create(recipe=recipe, user=self.user)
+        ShoppingCartRecipe.objects.create(recipe=recipe, user=self.user)
+        Follow.objects.create(following_author=self.author, user=self.user)
+        self.assertCounters(recipe, 1, 1)
+        self.assertUserCounters(self.author, 3, 1)
+        self.user.delete()
+        self.assertCounters(recipe, 0, 0)
+        self.assertUserCounters(self.author, 3, 0)
+        self.author.delete()
+        self.assertFalse(Recipe.objects.exists())
+
+    def test_interrupted_user_deletion(self):
+        pre_delete.connect(interrupt_user_deletion, sender=User)
+        try:
+            with self.assertRaises(UserDeletionError), transaction.atomic():
+                self.author.delete()
+        finally:
+            pre_delete.disconnect(interrupt_user_deletion, sender=User)
+        self.recipes[0].delete()
+        self.assertUserCounters(self.author, 2, 0)
@@ -0,0 +1,160 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import override_settings, TestCase
+from rest_framework.test import APIClient
+
+from recipes.indexes import (
+    INGREDIENT_RECIPE_CHANGES_KEY,
+    IngredientRecipeIndex,
+    record_recipes_changes,
+)
+from recipes.models import Ingredient, IngredientRecipe, Recipe
+from users.models import User
+
+
+@override_settings(CACHES={
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}
+})
+class IngredientRecipeIndexTest(TestCase):
+    """Check ingredient recipe index search and its updates."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.authors = [
+            User.objects.create_user(
+                email=f'author{number}@example.com',
+                first_name='Имя',
+                last_name='Фамилия',
+                password='password',
+                username=f'author{number}',
+            )
+            for number in range(2)
+        ]
+        cls.ingredients = [
+            Ingredient.objects.create(
+                name=f'Ингредиент {number}', measurement_unit='г'
+            )
+            for number in range(3)
+        ]
+        cls.recipes = [
+            Recipe.objects.create(
+                author=author,
+                cooking_time=10,
+                image='recipes/images/test.png',
+                name=f'Рецепт {number}',
+                text='Описание',
+            )
+            for number, author in enumerate(
+                (cls.authors[0], cls.authors[0], cls.authors[1])
+            )
+        ]
+        for recipe, ingredients in zip(cls.recipes, (
+            cls.ingredients[:1], cls.ingredients[:2], cls.ingredients[:1],
+        )):
+            IngredientRecipe.objects.bulk_create(
+                IngredientRecipe(
+                    amount=10, ingredient=ingredient, recipe=recipe
+                )
+                for ingredient in ingredients
+            )
+
+    def setUp(self):
+        cache.clear()
+        self.index = IngredientRecipeIndex()
+        self.first, self.second, self.third = (
+            recipe.id for recipe in self.recipes
+        )
+
+    def record_changes(self, recipe):
+        with self.captureOnCommitCallbacks(execute=True):
+            record_recipes_changes([recipe.id])
+
+    def search(self, *ingredients):
+        return self.index.search(
+            ingredient.id for ingredient in ingredients
+        )
+
+    def test_search_order(self):
+        self.assertEqual(
+            self.search(self.ingredients[0]),
+            [self.first, self.third, self.second]
+        )
+        self.assertEqual(self.search(self.ingredients[2]), [])
+
+    def test_added_ingredient(self):
+        self.search(self.ingredients[0])
+        IngredientRecipe.objects.create(
+            amount=10, ingredient=self.ingredients[2], recipe=self.recipes[2]
+        )
+        self.record_changes(self.recipes[2])
+        self.assertEqual(self.search(self.ingredients[2]), [self.third])
+        self.assertEqual(
+            self.search(self.ingredients[0]),
+            [self.first, self.second, self.third]
+        )
+
+    def test_removed_ingredient(self):
+        self.search(self.ingredients[0])
+        IngredientRecipe.objects.filter(
+            ingredient=self.ingredients[1], recipe=self.recipes[1]
+        ).delete()
+        self.record_changes(self.recipes[1])
+        self.assertEqual(self.search(self.ingredients[1]), [])
+        self.assertEqual(
+            self.search(self.ingredients[0]),
+            [self.first, self.second, self.third]
+        )
+
+    def test_changed_amount(self):
+        self.search(self.ingredients[0])
+        IngredientRecipe.objects.filter(recipe=self.recipes[1]).update(
+            amount=20
+        )
+        self.record_changes(self.recipes[1])
+        with mock.patch.object(self.index, 'build') as build:
+            self.assertEqual(
+                self.search(self.ingredients[0]),
+                [self.first, self.third, self.second]
+            )
+        build.assert_not_called()
+
+    def test_deleted_recipe(self):
+        self.search(self.ingredients[0])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.recipes[0].delete()
+        self.assertEqual(
+            self.search(self.ingredients[0]), [self.third, self.second]
+        )
+
+    def test_evicted_changes(self):
+        self.search(self.ingredients[0])
+        IngredientRecipe.objects.create(
+            amount=10, ingredient=self.ingredients[2], recipe=self.recipes[0]
+        )
+        self.record_changes(self.recipes[0])
+        self.record_changes(self.recipes[1])
+        cache.delete(f'{INGREDIENT_RECIPE_CHANGES_KEY}:1')
+        with mock.patch.object(
+            self.index, 'build', wraps=self.index.build
+        ) as build:
+            self.assertEqual(self.search(self.ingredients[2]), [self.first])
+        build.assert_called_once()
+
+    @override_settings(INGREDIENTS_SEARCH_LIMIT=1)
+    def test_filtered_recipes(self):
+        client = APIClient()
+        for author, recipes_ids in (
+            (self.authors[0], [self.first]),
+            (self.authors[1], [self.third]),
+        ):
+            with self.subTest(author=author.username):
+                response = client.get('/api/recipes/', {
+                    'author': author.id,
+                    'ingredients': self.ingredients[0].id,
+                })
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(
+                    [recipe['id'] for recipe in response.data['results']],
+                    recipes_ids
+                )
@@ -0,0 +1,136 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import EmptyPage
+from django.test import override_settings, TestCase
+from rest_framework.test import APIClient
+
+from api.paginators import ApproximateCountPaginator
+from recipes.models import Ingredient, IngredientRecipe, Recipe
+from users.models import User
+
+
+class LowCountPaginator(ApproximateCountPaginator):
+    """Paginator with count estimated lower than real one."""
+
+    count = 1
+
+
+@override_settings(CACHES={
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}
+})
+class ApproximateCountPaginationTest(TestCase):
+    """Check that stale or estimated count does not cut pages."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(
+            email='author@example.com',
+            first_name='Имя',
+            last_name='Фамилия',
+            password='password',
+            username='author',
+        )
+        cls.create_recipes(10)
+
+    @classmethod
+    def create_recipes(cls, count):
+        for number in range(count):
+            Recipe.objects.create(
+                author=cls.author,
+                cooking_time=10,
+                image='recipes/images/test.png',
+                name=f'Рецепт {number}',
+                text='Описание',
+            )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_low_count_does_not_cut_page(self):
+        paginator = LowCountPaginator(Recipe.objects.order_by('id'), 4)
+        page = paginator.page(2)
+        self.assertEqual(len(page), 4)
+        self.assertTrue(page.has_next())
+        page = paginator.page(3)
+        self.assertEqual(len(page), 2)
+        self.assertFalse(page.has_next())
+
+    def test_stale_cached_count_does_not_cut_page(self):
+        client = APIClient()
+        url = (
+            f'/api/recipes/?limit=4&{settings.COUNT_MODE_QUERY_PARAMETER_NAME}'
+            f'={settings.CACHED_COUNT_MODE}'
+        )
+        self.assertEqual(client.get(url).data['count'], 10)
+        self.create_recipes(5)
+        response = client.get(f'{url}&page=4')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 10)
+        self.assertEqual(len(response.data['results']), 3)
+        self.assertIsNone(response.data['next'])
+        response = client.get(f'{url}&page=3')
+        self.assertEqual(len(response.data['results']), 4)
+        self.assertIsNotNone(response.data['next'])
+
+    def test_page_after_last_is_not_found(self):
+        paginator = LowCountPaginator(Recipe.objects.order_by('id'), 4)
+        with self.assertRaises(EmptyPage):
+            paginator.page(4)
+
+
+@override_settings(CACHES={
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}
+})
+class RecipesCursorPaginationTest(TestCase):
+    """Check that cursor pagination rejects orderings set by filters."""
+
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user(
+            email='author@example.com',
+            first_name='Имя',
+            last_name='Фамилия',
+            password='password',
+            username='author',
+        )
+        cls.ingredient = Ingredient.objects.create(
+            measurement_unit='г', name='ингредиент'
+        )
+        for number in range(3):
+            recipe = Recipe.objects.create(
+                author=author,
+                cooking_time=10,
+                image='recipes/images/test.png',
+                name=f'Рецепт {number}',
+                text='Описание',
+            )
+            IngredientRecipe.objects.create(
+                amount=100, ingredient=cls.ingredient, recipe=recipe
+            )
+
+    def setUp(self):
+        cache.clear()
+        self.url = (
+            f'/api/recipes/?{settings.PAGINATION_MODE_QUERY_PARAMETER_NAME}'
+            f'={settings.CURSOR_PAGINATION_MODE}&limit=2'
+        )
+
+    def test_cursor_pagination(self):
+        response = APIClient().get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertIsNotNone(response.data['next'])
+
+    def test_cursor_pagination_with_filter_ordering(self):
+        for params in (
+            f'ordering={settings.POPULAR_ORDERING}',
+            'search=Рецепт',
+            f'ingredients={self.ingredient.id}',
+        ):
+            with self.subTest(params=params):
+                response = APIClient().get(f'{self.url}&{params}')
+                self.assertEqual(response.status_code, 400)
+                self.assertIn(
+                    settings.PAGINATION_MODE_QUERY_PARAMETER_NAME,
+                    response.data
+                )
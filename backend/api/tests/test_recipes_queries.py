@@ -0,0 +1,107 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.test import override_settings, TestCase
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from api.authentication import token_cache
+from recipes.models import (
+    Favorite,
+    Ingredient,
+    IngredientRecipe,
+    Recipe,
+    ShoppingCartRecipe,
+    Tag,
+)
+from users.models import Follow, User
+
+RECIPES_COUNT = settings.MAX_PAGE_SIZE + 10
+
+
+@override_settings(CACHES={
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}
+})
+class RecipesListQueriesTest(TestCase):
+    """
+    Check that recipes list query count does not depend on page size.
+
+    Anonymous request with empty caches queries tags ids, count, recipes
+    with authors, prefetches tags and ingredients, authenticated request
+    also queries token and prefetches authors with is_subscribed.
+    """
+
+    ANONYMOUS_QUERIES = 5
+    AUTHENTICATED_QUERIES = 7
+
+    @classmethod
+    def setUpTestData(cls):
+        authors = [
+            User.objects.create_user(
+                email=f'author{number}@example.com',
+                first_name='Имя',
+                last_name='Фамилия',
+                password='password',
+                username=f'author{number}',
+            )
+            for number in range(3)
+        ]
+        cls.user = authors[0]
+        tags = [
+            Tag.objects.create(
+                color=f'#00000{number}',
+                name=f'тег {number}',
+                slug=f'tag{number}'
+            )
+            for number in range(3)
+        ]
+        ingredients = [
+            Ingredient.objects.create(
+                measurement_unit='г', name=f'ингредиент {number}'
+            )
+            for number in range(5)
+        ]
+        for number in range(RECIPES_COUNT):
+            recipe = Recipe.objects.create(
+                author=authors[number % len(authors)],
+                cooking_time=10,
+                image='recipes/images/test.png',
+                name=f'Рецепт {number}',
+                text='Описание',
+            )
+            recipe.tags.set(tags[:number % len(tags) + 1])
+            IngredientRecipe.objects.bulk_create(
+                IngredientRecipe(
+                    amount=100, ingredient=ingredient, recipe=recipe
+                )
+                for ingredient in ingredients[:number % len(ingredients) + 1]
+            )
+            if number % 2:
+                Favorite.objects.create(recipe=recipe, user=cls.user)
+            if number % 3:
+                ShoppingCartRecipe.objects.create(recipe=recipe, user=cls.user)
+        Follow.objects.create(following_author=authors[1], user=cls.user)
+        cls.token = Token.objects.create(user=cls.user)
+
+    def assert_list_queries(self, client, queries):
+        """Check query count of recipes list pages of different sizes."""
+        for limit in (
+            settings.RECIPES_PAGE_SIZE, 50, settings.MAX_PAGE_SIZE
+        ):
+            with self.subTest(limit=limit):
+                cache.clear()
+                token_cache.delete(self.token.key)
+                with self.assertNumQueries(queries):
+                    response = client.get(f'/api/recipes/?limit={limit}')
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(
+                    len(response.data['results']),
+                    min(limit, settings.MAX_PAGE_SIZE)
+                )
+
+    def test_anonymous_recipes_list_queries(self):
+        self.assert_list_queries(APIClient(), self.ANONYMOUS_QUERIES)
+
+    def test_authenticated_recipes_list_queries(self):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        self.assert_list_queries(client, self.AUTHENTICATED_QUERIES)
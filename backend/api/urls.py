@@ -1,7 +1,13 @@
 from django.urls import include, path
 from rest_framework import routers
 
-from api.views import IngredientViewSet, RecipeViewSet, TagViewSet, UserViewSet
+from api.views import (
+    IngredientViewSet,
+    InstrumentationView,
+    RecipeViewSet,
+    TagViewSet,
+    UserViewSet,
+)
 
 router_v1 = routers.DefaultRouter()
 router_v1.register('ingredients', IngredientViewSet, basename='ingredient')
@@ -11,5 +17,10 @@ router_v1.register('users', UserViewSet, basename='user')
 
 urlpatterns = [
     path('auth/', include('djoser.urls.authtoken')),
+    path(
+        'instrumentation/',
+        InstrumentationView.as_view(),
+        name='instrumentation'
+    ),
     path('', include(router_v1.urls)),
 ]
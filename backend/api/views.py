@@ -1,6 +1,12 @@
+from collections import defaultdict
+
 from django.conf import settings
 from django.contrib.auth.hashers import make_password
-from django.db.models import Sum
+from django.db.models import (
+    BooleanField, Exists, F, OuterRef, Prefetch, Sum, Value, Window
+)
+from django.db.models.functions import RowNumber
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django.utils.timezone import now
 from django_filters.rest_framework import DjangoFilterBackend
@@ -11,12 +17,16 @@ from rest_framework import status
 from rest_framework.decorators import action
 from rest_framework.filters import SearchFilter
 from rest_framework.permissions import (
-    IsAuthenticated, IsAuthenticatedOrReadOnly
+    IsAdminUser, IsAuthenticated, IsAuthenticatedOrReadOnly
 )
 from rest_framework.response import Response
+from rest_framework.views import APIView
 from rest_framework.viewsets import ModelViewSet
 
 from api.filters import IngredientFilter, RecipeFilter
+from api.instrumentation import (
+    histogram, time_serializer, TimedSerializerMixin
+)
 from api.paginators import RecipesPagination, UsersPagination
 from api.permissions import IsAuthor
 from api.renderers import TextShoppingCartRenderer
@@ -24,20 +34,23 @@ from api.serializers import (
     CreateFavoriteSerializer,
     CreateFollowSerializer,
     CreateShoppingCartRecipeSerializer,
+    FavoriteShoppingCartRecipeSerializer,
     FollowSerializer,
     IngredientSerializer,
-    RecipeReadSerializer,
     RecipeSerializer,
+    RecipesIdsSerializer,
     TagSerializer,
     UserPasswordSerializer,
     UserRegistationSerializer,
     UserSerializer,
 )
 from api.viewsets import (
-    CreateDestroyListRetrieveModelViewSet, ListRetrieveModelViewSet
+    CachedListRetrieveModelViewSet, CreateDestroyListRetrieveModelViewSet
 )
+from recipes.counters import delete_counted_rows, update_counters
+from recipes.indexes import ingredient_name_index
 from recipes.models import (
-    Favorite, Ingredient, Recipe, ShoppingCartRecipe, Tag
+    Favorite, Ingredient, IngredientRecipe, Recipe, ShoppingCartRecipe, Tag
 )
 from users.models import Follow, User
 
@@ -55,7 +68,7 @@ class AuthTokenCreateView(TokenCreateView):
         )
 
 
-class IngredientViewSet(ListRetrieveModelViewSet):
+class IngredientViewSet(CachedListRetrieveModelViewSet):
     """Process get list of Ingredient instances and get one's detail."""
 
     queryset = Ingredient.objects.all()
@@ -63,8 +76,32 @@ class IngredientViewSet(ListRetrieveModelViewSet):
     search_fields = ('^name',)
     serializer_class = IngredientSerializer
 
+    def filter_queryset(self, queryset):
+        """Get ingredients which names start with name query parameter."""
+        name = self.request.query_params.get(
+            IngredientFilter.search_param, ''
+        ).strip()
+        if self.action == 'list' and name:
+            return ingredient_name_index.search(name)
+        return super().filter_queryset(queryset)
+
 
-class RecipeViewSet(ModelViewSet):
+class InstrumentationView(APIView):
+    """Process get and reset of collected requests metrics."""
+
+    permission_classes = (IsAdminUser,)
+
+    def get(self, request):
+        """Get histogram of requests metrics by view actions."""
+        return Response(histogram.dump(), status=status.HTTP_200_OK)
+
+    def delete(self, request):
+        """Delete collected requests metrics."""
+        histogram.clear()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class RecipeViewSet(TimedSerializerMixin, ModelViewSet):
     """Process methods with Recipe, Favorite, ShoppingCartRecipe instances."""
 
     http_method_names = ['get', 'post', 'patch', 'delete']
@@ -75,6 +112,39 @@ class RecipeViewSet(ModelViewSet):
     permission_classes = (IsAuthenticatedOrReadOnly, IsAuthor)
     serializer_class = RecipeSerializer
 
+    def get_queryset(self):
+        """
+        Prefetch recipe relations and annotate is_favorited,
+        is_in_shopping_cart values, so page query count is fixed,
+        recipe is not serialized on deletion.
+        """
+        if self.action == 'destroy':
+            return self.queryset
+        user = self.request.user
+        queryset = self.queryset.prefetch_related(
+            'tags',
+            Prefetch(
+                'ingredients_recipes',
+                queryset=IngredientRecipe.objects.select_related('ingredient')
+            )
+        )
+        if not user.is_authenticated:
+            return queryset.select_related('author')
+        return queryset.prefetch_related(
+            Prefetch('author', queryset=User.objects.annotate(
+                is_subscribed=Exists(Follow.objects.filter(
+                    following_author=OuterRef('pk'), user=user
+                ))
+            ))
+        ).annotate(
+            is_favorited=Exists(Favorite.objects.filter(
+                recipe=OuterRef('pk'), user=user
+            )),
+            is_in_shopping_cart=Exists(ShoppingCartRecipe.objects.filter(
+                recipe=OuterRef('pk'), user=user
+            ))
+        )
+
     def perform_create(self, serializer):
         """Save value for Recipe author field."""
         serializer.save(author=self.request.user)
@@ -115,12 +185,65 @@ class RecipeViewSet(ModelViewSet):
             )
         return self.delete_recipe(ShoppingCartRecipe, request.user, pk)
 
+    @action(
+        detail=False,
+        methods=['post', 'delete'],
+        permission_classes=(IsAuthenticated,),
+        url_name='bulk_add_to_or_delete_from_favorites',
+        url_path=r'favorite'
+    )
+    def bulk_manage_favorite_recipes(self, request):
+        """Add list of recipes to favorites of request user or delete ones."""
+        return self.bulk_manage_recipes(Favorite, request)
+
+    @action(
+        detail=False,
+        methods=['post', 'delete'],
+        permission_classes=(IsAuthenticated,),
+        url_name='bulk_add_to_or_delete_from_shopping_cart',
+        url_path=r'shopping_cart'
+    )
+    def bulk_manage_shopping_cart_recipes(self, request):
+        """
+        Add list of recipes to shopping cart of request user or delete ones.
+        """
+        return self.bulk_manage_recipes(ShoppingCartRecipe, request)
+
+    def bulk_manage_recipes(self, model, request):
+        """
+        Add recipes to favorites or shopping cart of request user
+        skipping already added ones, or delete recipes from it.
+        """
+        serializer = RecipesIdsSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        recipes = serializer.validated_data.get('recipes')
+        recipes_ids = [recipe.id for recipe in recipes]
+        if request.method == 'DELETE':
+            if model.objects.filter(
+                recipe_id__in=recipes_ids, user=request.user
+            ).delete()[0]:
+                update_counters(
+                    counted_model=model._meta.label, pks=recipes_ids
+                )
+            return Response(status=status.HTTP_204_NO_CONTENT)
+        model.objects.bulk_create(
+            [model(recipe=recipe, user=request.user) for recipe in recipes],
+            ignore_conflicts=True
+        )
+        update_counters(counted_model=model._meta.label, pks=recipes_ids)
+        return Response(
+            time_serializer(FavoriteShoppingCartRecipeSerializer(
+                recipes, context={'request': request}, many=True
+            )).data,
+            status=status.HTTP_201_CREATED
+        )
+
     def add_recipe(self, model, serializer, request, recipe_id):
         """Add recipe to favorites or shopping cart of request user."""
-        model_serializer = serializer(
+        model_serializer = time_serializer(serializer(
             context={'request': request},
             data={'user': request.user.id, 'recipe': recipe_id}
-        )
+        ))
         model_serializer.is_valid(raise_exception=True)
         model_serializer.save()
         return Response(
@@ -129,13 +252,9 @@ class RecipeViewSet(ModelViewSet):
 
     def delete_recipe(self, model, current_user, recipe_id):
         """Delete recipe from favorites or shopping cart of request user."""
-        recipe = model.objects.filter(
-            recipe=get_object_or_404(Recipe, id=recipe_id),
-            user=current_user
-        )
-        if recipe.exists():
-            recipe.delete()
+        if delete_counted_rows(model, recipe_id=recipe_id, user=current_user):
             return Response(status=status.HTTP_204_NO_CONTENT)
+        get_object_or_404(Recipe, id=recipe_id)
         return Response(
             data={
                 'error':
@@ -155,31 +274,25 @@ class RecipeViewSet(ModelViewSet):
     )
     def download_shopping_cart(self, request, *args, **kwargs):
         """Download shopping cart of request user as file."""
-        queryset = RecipeFilter.filter_shopping_cart_recipes(
-            self,
-            queryset=self.queryset,
-            name='is_in_shopping_cart',
-            value=1
-        )
-        RecipeReadSerializer(
-            context={'request': request}, data=queryset, many=True
-        ).is_valid()
-        return Response(
-            data=TextShoppingCartRenderer.format_ingredients_data(
-                queryset.values(
-                    'ingredients__name', 'ingredients__measurement_unit',
-                ).order_by('ingredients__name').annotate(
-                    amount=Sum('ingredients_recipes__amount')
-                )
+        renderer = request.accepted_renderer
+        ingredients = IngredientRecipe.objects.filter(
+            recipe__shopping_cart_recipes__user=request.user
+        ).values(
+            'ingredient__name', 'ingredient__measurement_unit'
+        ).annotate(amount=Sum('amount')).order_by('ingredient__name')
+        return StreamingHttpResponse(
+            renderer.render_lines(
+                renderer.format_ingredients_data(ingredients.iterator())
             ),
+            content_type=f'{renderer.media_type}; charset={renderer.charset}',
             headers={
                 'Content-Disposition': 'attachment; '
                 f'filename=foodgram_shopping_cart_'
-                f'{now():%d-%b_%H-%M}.{(request.accepted_renderer.format)}'
+                f'{now():%d-%b_%H-%M}.{renderer.format}'
             })
 
 
-class TagViewSet(ListRetrieveModelViewSet):
+class TagViewSet(CachedListRetrieveModelViewSet):
     """Process get list of Tag instances and get one's detail."""
 
     filter_backends = (SearchFilter,)
@@ -220,7 +333,9 @@ class UserViewSet(CreateDestroyListRetrieveModelViewSet):
     def get_request_user_data(self, request):
         """Get request user data."""
         return Response(
-            UserSerializer(request.user, context={'request': request}).data,
+            time_serializer(
+                UserSerializer(request.user, context={'request': request})
+            ).data,
             status=status.HTTP_200_OK
         )
 
@@ -239,7 +354,7 @@ class UserViewSet(CreateDestroyListRetrieveModelViewSet):
         )
         if serializer.is_valid(raise_exception=True):
             user.set_password(serializer.validated_data.get('new_password'))
-            user.save()
+            user.save(update_fields=['password'])
             return Response(
                 data={'success': settings.SUCCESSFULLY_PASSWORD_SETTING},
                 status=status.HTTP_204_NO_CONTENT
@@ -255,13 +370,48 @@ class UserViewSet(CreateDestroyListRetrieveModelViewSet):
     )
     def get_user_subscriptions(self, request, *args, **kwargs):
         """Get authors from request user's subscriptions."""
-        return self.get_paginated_response(FollowSerializer(
-            self.paginate_queryset(
-                User.objects.filter(authors__user=request.user)
-            ),
-            context={'request': request},
-            many=True
-        ).data)
+        authors = self.paginate_queryset(
+            User.objects.filter(authors__user=request.user).annotate(
+                is_subscribed=Value(True, output_field=BooleanField())
+            )
+        )
+        recipes_limit = request.GET.get('recipes_limit')
+        authors_recipes = self.get_authors_recipes(
+            authors,
+            int(recipes_limit)
+            if recipes_limit and recipes_limit.isdigit() else None
+        )
+        for author in authors:
+            author.author_recipes = authors_recipes[author.id]
+        return self.get_paginated_response(time_serializer(FollowSerializer(
+            authors, context={'request': request}, many=True
+        )).data)
+
+    @staticmethod
+    def get_authors_recipes(authors, recipes_limit=None):
+        """
+        Get recipes of authors by one query,
+        recipes_limit newest recipes of each author at most.
+        """
+        authors_recipes = defaultdict(list)
+        if not authors:
+            return authors_recipes
+        sql, params = Recipe.objects.filter(author__in=authors).annotate(
+            author_recipe_number=Window(
+                expression=RowNumber(),
+                partition_by=F('author'),
+                order_by=(F('created_at').desc(), F('name').asc())
+            )
+        ).order_by().query.sql_with_params()
+        query = f'SELECT * FROM ({sql}) AS author_recipes'
+        if recipes_limit is not None:
+            query += ' WHERE author_recipe_number <= %s'
+            params += (recipes_limit,)
+        for recipe in Recipe.objects.raw(
+            query + ' ORDER BY author_recipe_number', params
+        ):
+            authors_recipes[recipe.author_id].append(recipe)
+        return authors_recipes
 
     @action(
         detail=True,
@@ -273,25 +423,24 @@ class UserViewSet(CreateDestroyListRetrieveModelViewSet):
     def manage_subscriptions(self, request, pk):
         """Add author to subscriptions of request user or delete one."""
         current_user = request.user
-        author = get_object_or_404(User, id=pk)
         if request.method == 'POST':
-            serializer = CreateFollowSerializer(
+            get_object_or_404(User, id=pk)
+            serializer = time_serializer(CreateFollowSerializer(
                 context={'request': request},
                 data={'user': current_user.id, 'following_author': pk}
-            )
+            ))
             serializer.is_valid(raise_exception=True)
             serializer.save()
             return Response(serializer.data, status=status.HTTP_201_CREATED)
-        try:
-            Follow.objects.get(
-                following_author=author, user=current_user
-            ).delete()
-        except Follow.DoesNotExist:
-            return Response(
-                data={
-                    'error': settings.FOLLOW_RECIPE_DOES_NOT_EXIST.format(
-                        request_object='Запрашиваемая подписка'
-                    )},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-        return Response(status=status.HTTP_204_NO_CONTENT)
+        if delete_counted_rows(
+            Follow, following_author_id=pk, user=current_user
+        ):
+            return Response(status=status.HTTP_204_NO_CONTENT)
+        get_object_or_404(User, id=pk)
+        return Response(
+            data={
+                'error': settings.FOLLOW_RECIPE_DOES_NOT_EXIST.format(
+                    request_object='Запрашиваемая подписка'
+                )},
+            status=status.HTTP_400_BAD_REQUEST
+        )
@@ -1,15 +1,66 @@
+from hashlib import md5
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.http import parse_etags, quote_etag
+from rest_framework import status
 from rest_framework.mixins import (
     CreateModelMixin, DestroyModelMixin, ListModelMixin, RetrieveModelMixin
 )
+from rest_framework.response import Response
 from rest_framework.viewsets import GenericViewSet
 
+from api.instrumentation import TimedSerializerMixin
+from recipes.utils import get_cache_version
+
 
 class ListRetrieveModelViewSet(
-    ListModelMixin, RetrieveModelMixin, GenericViewSet,
+    TimedSerializerMixin, ListModelMixin, RetrieveModelMixin, GenericViewSet,
 ):
     """Mixin for list and retrieve methods, contains SearchFilter."""
 
 
+class CachedListRetrieveModelViewSet(ListRetrieveModelViewSet):
+    """
+    Mixin for list and retrieve methods, caches responses data
+    until cache version of queryset model is changed.
+    """
+
+    def list(self, request, *args, **kwargs):
+        return self.get_cached_response(
+            super().list, request, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+    def get_cached_response(self, get_response, request, *args, **kwargs):
+        """
+        Return cached response data, 304 for known ETag of successful
+        response, ETag depends on cache version and request path.
+        """
+        version = get_cache_version(self.queryset.model)
+        cache_key = f'{self.basename}:{version}:{request.get_full_path()}'
+        data = cache.get(cache_key)
+        if data is None:
+            response = get_response(request, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+            cache.set(cache_key, response.data, settings.CACHE_TIMEOUT)
+        else:
+            response = Response(data)
+        etag = quote_etag(md5(cache_key.encode()).hexdigest())
+        if_none_match = parse_etags(request.headers.get('If-None-Match', ''))
+        if etag in if_none_match or '*' in if_none_match:
+            return Response(
+                status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag}
+            )
+        response['ETag'] = etag
+        return response
+
+
 class CreateDestroyListRetrieveModelViewSet(
     CreateModelMixin,
     DestroyModelMixin,
@@ -1,5 +1,6 @@
 # flake8: noqa
 import os
+import tempfile
 from pathlib import Path
 
 from dotenv import load_dotenv
@@ -13,6 +14,10 @@ SECRET_KEY = os.getenv('SECRET_DJANGO_KEY', 'secret_key')
 
 DEBUG = os.getenv('DEBUG_VALUE') == 'True'
 
+INSTRUMENTATION_ENABLED = os.getenv(
+    'INSTRUMENTATION_ENABLED', str(DEBUG)
+) == 'True'
+
 ALLOWED_HOSTS = os.getenv('ALLOWED_HOSTS', '').split(',')
 
 INSTALLED_APPS = [
@@ -42,6 +47,9 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+if INSTRUMENTATION_ENABLED:
+    MIDDLEWARE.insert(0, 'api.instrumentation.InstrumentationMiddleware')
+
 ROOT_URLCONF = 'foodgram_backend.urls'
 
 TEMPLATES = [
@@ -84,6 +92,26 @@ else:
         }
     }
 
+# Cache settings
+
+# Cache versions must be shared by all workers and management commands,
+# file based cache is shared on one host, set CACHE_BACKEND to memcached
+# backend for several hosts.
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv(
+            'CACHE_BACKEND',
+            'django.core.cache.backends.filebased.FileBasedCache'
+        ),
+        'LOCATION': os.getenv(
+            'CACHE_LOCATION',
+            os.path.join(tempfile.gettempdir(), 'foodgram_cache')
+        ),
+    }
+}
+
+CACHE_TIMEOUT = 60 * 60 * 24
+
 # Password validation
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -129,10 +157,21 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'api.authentication.CachedTokenAuthentication',
     ],
 }
 
+# Token users are cached in memory of each process, user and user tokens
+# changes are marked in shared cache, so every process drops them.
+AUTH_TOKEN_CACHE_MAX_SIZE = 10_000
+AUTH_TOKEN_CACHE_TIMEOUT = 60
+
+# Instrumentation settings
+
+INSTRUMENTATION_HISTOGRAM_BOUNDS = (
+    1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000
+)
+
 # Djoser settings
 
 DJOSER = {
@@ -145,6 +184,7 @@ DJOSER = {
 # .csv data import settings
 
 CSV_DATA_DIRECTORY_PATH = 'csv_data'
+CSV_IMPORT_BATCH_SIZE = 5000
 
 # Admin site settings
 
@@ -157,19 +197,42 @@ SHOPPING_CART_FILE_HEADERS = ['FOODGRAM SHOPPING LIST',]
 # Pagination settings
 
 QUERY_PARAMETER_NAME = 'limit'
+PAGINATION_MODE_QUERY_PARAMETER_NAME = 'pagination'
+CURSOR_PAGINATION_MODE = 'cursor'
+COUNT_MODE_QUERY_PARAMETER_NAME = 'count'
+CACHED_COUNT_MODE = 'cached'
+ESTIMATED_COUNT_MODE = 'estimated'
+PAGINATION_COUNT_CACHE_TIMEOUT = 60
 MAX_PAGE_SIZE = 30
 RECIPES_PAGE_SIZE = 6
 USERS_PAGE_SIZE = 6
 
 # Recipes settings
 
+BULK_RECIPES_MAX_COUNT = 100
 COOKING_TIME_MAX_MINUTES = 7200
 COOKING_TIME_MIN_MINUTES = 1
+INGREDIENTS_AUTOCOMPLETE_LIMIT = 30
+INGREDIENTS_SEARCH_LIMIT = 300
 INGREDIENT_AMOUNT_MAX = 100_000
 INGREDIENT_AMOUNT_MIN = 1
 INGREDIENT_NAME_MEASURE_MAX_LENGTH = 200
+IMAGE_SIZE_QUERY_PARAMETER_NAME = 'image_size'
+RECIPE_IMAGE_RENDITION_FORMAT = 'webp'
+RECIPE_IMAGE_RENDITIONS_PATH = 'recipes/images/renditions/'
+RECIPE_IMAGE_SIZES = {'small': 320, 'medium': 640, 'large': 1280}
+RECIPE_IMAGE_WORKERS = int(os.getenv('RECIPE_IMAGE_WORKERS', 2))
 RECIPE_NAME_MAX_LENGTH = 200
+SEARCH_CONFIG = 'russian'
 TAG_NAME_SLUG_MAX_LENGTH = 200
+TAGS_MASK_MAX_TAG_ID = 63
+
+# Popularity settings
+
+POPULAR_ORDERING = 'popular'
+POPULARITY_FAVORITE_WEIGHT = 1.0
+POPULARITY_HALF_LIFE_DAYS = 7
+POPULARITY_SHOPPING_CART_WEIGHT = 1.5
 
 # Users settings
 
@@ -181,15 +244,28 @@ USERNAME_FIELD_MAX_LENGTH = 150
 
 # Success/error messages
 
+BENCHMARK_DATA_CREATED = ('{users} users and {recipes} recipes'
+                          ' have been created in {seconds:.2f}s')
+BENCHMARK_RESULT = ('{name}: status {status}, p50 {p50:.1f}ms,'
+                    ' p95 {p95:.1f}ms, {queries} queries')
+BULK_RECIPES_DO_NOT_EXIST = 'Рецепты с id {ids} не существуют'
 COOKING_TIME_INGREDIENT_AMOUNT_TOO_LOW = '{field_name} не может быть меньше {min_value}'
 COOKING_TIME_INGREDIENT_AMOUNT_TOO_HIGH = 'Значение {field_name} слишком большое'
+COUNTERS_UPDATE_SUCCESS = '{count} objects counters have been updated'
+CSV_IMPORT_COPY_POSTGRESQL_ONLY = 'COPY mode is available for PostgreSQL database only'
 CSV_IMPORT_PROCCESSING = 'Importing objects from {filename}.csv is proccessing...'
+CSV_IMPORT_RELATED_OBJECT_NOT_FOUND = 'Object with id {id} for field {field_name} from {filename}.csv does not exist'
 CSV_IMPORT_SUCCESS = ('{count} objects from {filename}.csv'
-                      ' has been successfully imported into {filename} model')
+                      ' has been successfully imported into {filename} model'
+                      ' in {seconds:.2f}s ({speed:.0f} rows/s)')
+CURSOR_PAGINATION_WITH_ORDERING = ('Курсорная пагинация недоступна при сортировке'
+                                   ' по популярности, поиске и фильтре по ингредиентам')
 FOLLOW_RECIPE_DOES_NOT_EXIST = '{request_object} не существует'
 INVALID_CURRENT_PASSWORD_VALUE = 'Неверное значение поля "Старый пароль"'
+POPULARITY_UPDATE_SUCCESS = 'Popularity of {count} recipes has been updated'
 RECIPE_CREATION_WITH_DUPLICATE_DATA = 'Каждый {field_name} может быть добавлен только один раз'
 RECIPE_CREATION_WITHOUT_REQ_FIELDS = 'Поле {field_name} не может быть пустым'
+RECIPE_IMAGE_RENDITIONS_SUCCESS = 'Renditions of {count} of {total} images have been created'
 SHOP_CART_FAVORITES_TWICE_ADDING_DELETING = 'Рецепт уже {action}'
 SUBSCRIBE_TWICE_TO_SAME_AUTHOR = 'Вы уже подписаны на данного автора'
 SUBSCRIBE_TO_SELF = 'Пользователь не может подписаться на себя'
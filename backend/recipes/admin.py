@@ -1,6 +1,8 @@
 from django.conf import settings
 from django.contrib import admin
 
+from recipes.counters import get_related_ids, update_counters
+from recipes.indexes import record_recipes_changes
 from recipes.models import (
     Favorite,
     Ingredient,
@@ -10,6 +12,33 @@ from recipes.models import (
     Tag,
     TagRecipe
 )
+from recipes.utils import update_tags_masks
+
+
+class CountersAdminMixin:
+    """Recount counters of objects related to saved or deleted rows."""
+
+    def recount_counters(self, objects):
+        """Recount counters of objects related to objects once."""
+        counted_model = self.model._meta.label
+        for model, pks in get_related_ids(objects, counted_model).items():
+            update_counters(model=model, counted_model=counted_model, pks=pks)
+
+    def save_model(self, request, obj, form, change):
+        objects = [obj]
+        if change:
+            objects.append(self.model.objects.get(pk=obj.pk))
+        super().save_model(request, obj, form, change)
+        self.recount_counters(objects)
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        self.recount_counters([obj])
+
+    def delete_queryset(self, request, queryset):
+        objects = list(queryset)
+        super().delete_queryset(request, queryset)
+        self.recount_counters(objects)
 
 
 class FavoriteInline(admin.StackedInline):
@@ -30,7 +59,7 @@ class TagRecipeInline(admin.StackedInline):
 
 
 @admin.register(Favorite)
-class FavoriteAdmin(admin.ModelAdmin):
+class FavoriteAdmin(CountersAdminMixin, admin.ModelAdmin):
     list_display = ('user', 'recipe', 'created_at',)
     list_filter = ('user__username',)
     search_fields = ('user__username', 'recipe__name')
@@ -45,7 +74,7 @@ class IngredientAdmin(admin.ModelAdmin):
 
 
 @admin.register(Recipe)
-class RecipeAdmin(admin.ModelAdmin):
+class RecipeAdmin(CountersAdminMixin, admin.ModelAdmin):
     inlines = (FavoriteInline, IngredientRecipeInline, TagRecipeInline)
     list_display = (
         'author',
@@ -57,9 +86,15 @@ class RecipeAdmin(admin.ModelAdmin):
     list_filter = ('author', 'name', 'ingredients', 'tags')
     search_fields = ('author__username', 'name', 'ingredients', 'tags')
 
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        update_counters(model='recipes.Recipe', pks=[form.instance.pk])
+        update_tags_masks([form.instance.pk])
+        record_recipes_changes([form.instance.pk])
+
 
 @admin.register(ShoppingCartRecipe)
-class ShoppingCartRecipeAdmin(admin.ModelAdmin):
+class ShoppingCartRecipeAdmin(CountersAdminMixin, admin.ModelAdmin):
     list_display = ('user', 'recipe', 'created_at',)
     list_filter = ('user',)
     search_fields = ('user__username', 'recipe__name')
@@ -0,0 +1,110 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.apps import apps as global_apps
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Greatest
+
+COUNTERS = (
+    ('recipes.Recipe', 'favorites_count', 'recipes.Favorite', 'recipe'),
+    (
+        'recipes.Recipe',
+        'shopping_cart_count',
+        'recipes.ShoppingCartRecipe',
+        'recipe'
+    ),
+    ('users.User', 'recipes_count', 'recipes.Recipe', 'author'),
+    ('users.User', 'subscribers_count', 'users.Follow', 'following_author'),
+)
+
+deleted_authors_ids = ContextVar('deleted_authors_ids', default=frozenset())
+
+
+@contextmanager
+def deleting_authors(authors_ids):
+    """
+    Mark authors as being deleted in current context, their recipes
+    deletions then leave counters and indexes to user post_delete.
+    """
+    token = deleted_authors_ids.set(
+        deleted_authors_ids.get() | frozenset(authors_ids)
+    )
+    try:
+        yield
+    finally:
+        deleted_authors_ids.reset(token)
+
+
+def change_counters(instance, delta: int):
+    """
+    Change counters which count rows of instance model by delta,
+    counters do not go below zero if they drifted.
+    """
+    for model, field_name, counted_model, related_field in COUNTERS:
+        if counted_model == instance._meta.label:
+            global_apps.get_model(model).objects.filter(
+                pk=getattr(instance, f'{related_field}_id')
+            ).update(**{field_name: Greatest(F(field_name) + delta, 0)})
+
+
+def delete_counted_rows(model, **lookups):
+    """
+    Delete model rows, decrease counters of related objects,
+    return deleted rows count.
+
+    Counted models have no delete signals receivers and no cascades,
+    so Django deletes their rows by one DELETE query.
+    """
+    deleted_count = model.objects.filter(**lookups).delete()[0]
+    if deleted_count:
+        change_counters(model(**lookups), -deleted_count)
+    return deleted_count
+
+
+def get_related_ids(objects, counted_model):
+    """
+    Return ids of objects with counters of counted_model rows
+    by counter model label.
+    """
+    related_ids = {}
+    for model, _, counted_label, related_field in COUNTERS:
+        if counted_label == counted_model:
+            related_ids.setdefault(model, set()).update(
+                getattr(obj, f'{related_field}_id') for obj in objects
+            )
+    return related_ids
+
+
+def update_counters(
+    apps=global_apps, model=None, counted_model=None, pks=None
+):
+    """
+    Set counters values by counting rows, return updated rows count.
+
+    Update only counters of model objects, which count counted_model rows,
+    of pks objects, if passed.
+    """
+    updated_count = 0
+    for model_label, field_name, counted_label, related_field in COUNTERS:
+        if (
+            model is not None and model != model_label
+            or counted_model is not None and counted_model != counted_label
+        ):
+            continue
+        counter_model = apps.get_model(model_label)
+        actual_count = Coalesce(Subquery(
+            apps.get_model(counted_label).objects.filter(
+                **{related_field: OuterRef('pk')}
+            ).order_by().values(related_field).annotate(
+                count=Count('pk')
+            ).values('count')
+        ), 0)
+        objects = counter_model.objects.all()
+        if pks is not None:
+            objects = objects.filter(pk__in=pks)
+        updated_count += counter_model.objects.filter(
+            pk__in=objects.annotate(
+                actual_count=actual_count
+            ).exclude(**{field_name: F('actual_count')}).values('pk')
+        ).update(**{field_name: actual_count})
+    return updated_count
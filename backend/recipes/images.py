@@ -0,0 +1,89 @@
+import io
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db.transaction import on_commit
+from PIL import Image
+
+from recipes.models import Recipe
+
+logger = logging.getLogger(__name__)
+
+executor = ThreadPoolExecutor(
+    max_workers=settings.RECIPE_IMAGE_WORKERS,
+    thread_name_prefix='recipe_images'
+)
+pending_images = set()
+pending_images_lock = Lock()
+
+
+def get_rendition_name(image_name: str, size: str):
+    """Return storage name of image rendition for size."""
+    stem = os.path.splitext(os.path.basename(image_name))[0]
+    return (f'{settings.RECIPE_IMAGE_RENDITIONS_PATH}'
+            f'{stem}_{size}.{settings.RECIPE_IMAGE_RENDITION_FORMAT}')
+
+
+def create_rendition(image_name: str, size: str):
+    """
+    Resize image to size and save it as rendition if it does not exist,
+    delete copy saved under alternate name by concurrent worker.
+    """
+    rendition_name = get_rendition_name(image_name, size)
+    if default_storage.exists(rendition_name):
+        return rendition_name
+    with default_storage.open(image_name) as image_file:
+        image = Image.open(image_file)
+        image.thumbnail(
+            (settings.RECIPE_IMAGE_SIZES[size],) * 2, Image.LANCZOS
+        )
+        buffer = io.BytesIO()
+        image.save(buffer, format=settings.RECIPE_IMAGE_RENDITION_FORMAT)
+    saved_name = default_storage.save(
+        rendition_name, ContentFile(buffer.getvalue())
+    )
+    if saved_name != rendition_name:
+        default_storage.delete(saved_name)
+    return rendition_name
+
+
+def create_renditions(image_name: str):
+    """
+    Create renditions of image for all sizes, mark recipes with image
+    as having renditions or as failed ones, so requests do not schedule
+    them again, return True if all renditions are created.
+    """
+    try:
+        for size in settings.RECIPE_IMAGE_SIZES:
+            create_rendition(image_name, size)
+    except Exception:
+        logger.exception('Renditions of image %s were not created', image_name)
+        created = False
+    else:
+        created = True
+    finally:
+        with pending_images_lock:
+            pending_images.discard(image_name)
+    Recipe.objects.filter(image=image_name).update(
+        has_image_renditions=created
+    )
+    return created
+
+
+def submit_renditions(image_name: str):
+    """Create image renditions in thread pool unless they are pending."""
+    with pending_images_lock:
+        if image_name in pending_images:
+            return
+        pending_images.add(image_name)
+    executor.submit(create_renditions, image_name)
+
+
+def schedule_renditions(image_name: str):
+    """Create image renditions in thread pool after transaction commit."""
+    on_commit(lambda: submit_renditions(image_name))
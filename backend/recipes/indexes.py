@@ -0,0 +1,199 @@
+import heapq
+from array import array
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from threading import Lock
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.transaction import on_commit
+
+from recipes.models import Ingredient, IngredientRecipe
+from recipes.utils import get_cache_version
+
+INGREDIENT_RECIPE_CHANGES_KEY = 'ingredient_recipe_changes'
+
+
+class IngredientNameIndex:
+    """
+    In-process sorted index of ingredient names for prefix search.
+
+    Index is built on first search and rebuilt on search
+    if cache version of Ingredient instances is changed.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._version = None
+        self._names = None
+        self._ingredients = None
+
+    def build(self, version):
+        """Load ingredients sorted by lowercase name."""
+        ingredients = sorted(
+            Ingredient.objects.all(),
+            key=lambda ingredient: (ingredient.name.lower(), ingredient.name)
+        )
+        self._ingredients = ingredients
+        self._names = [ingredient.name.lower() for ingredient in ingredients]
+        self._version = version
+
+    def search(self, prefix, limit=None):
+        """Return ingredients which names start with prefix."""
+        with self._lock:
+            version = get_cache_version(Ingredient)
+            if self._version != version:
+                self.build(version)
+            names, ingredients = self._names, self._ingredients
+        limit = limit or settings.INGREDIENTS_AUTOCOMPLETE_LIMIT
+        prefix = prefix.lower()
+        result = []
+        for position in range(bisect_left(names, prefix), len(names)):
+            if len(result) == limit or not names[position].startswith(prefix):
+                break
+            result.append(ingredients[position])
+        return result
+
+
+def record_recipes_changes(recipes_ids):
+    """
+    Save ids of recipes which ingredients are changed after commit,
+    ingredient recipe indexes of all processes load these recipes again.
+    """
+    recipes_ids = list(recipes_ids)
+    if not recipes_ids:
+        return
+
+    def record():
+        cache.add(INGREDIENT_RECIPE_CHANGES_KEY, 0, None)
+        # incr of file based cache is not atomic, take next number
+        # if concurrent writer has taken the same one.
+        change_number = cache.incr(INGREDIENT_RECIPE_CHANGES_KEY)
+        while not cache.add(
+            f'{INGREDIENT_RECIPE_CHANGES_KEY}:{change_number}',
+            recipes_ids,
+            settings.CACHE_TIMEOUT
+        ):
+            change_number = cache.incr(INGREDIENT_RECIPE_CHANGES_KEY)
+
+    on_commit(record)
+
+
+class IngredientRecipeIndex:
+    """
+    In-process inverted index of ingredient id to sorted recipes ids.
+
+    Index is rebuilt on search if cache version of IngredientRecipe
+    instances is changed, recipes recorded as changed are loaded again.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._version = None
+        self._change_number = 0
+        self._recipes = {}
+        self._recipes_ingredients = {}
+
+    def build(self, version, change_number):
+        """Load recipes ids of every ingredient."""
+        recipes = defaultdict(lambda: array('q'))
+        recipes_ingredients = defaultdict(list)
+        for ingredient_id, recipe_id in IngredientRecipe.objects.order_by(
+            'recipe_id'
+        ).values_list('ingredient_id', 'recipe_id').iterator():
+            recipes[ingredient_id].append(recipe_id)
+            recipes_ingredients[recipe_id].append(ingredient_id)
+        self._recipes = dict(recipes)
+        self._recipes_ingredients = dict(recipes_ingredients)
+        self._version = version
+        self._change_number = change_number
+
+    def update(self, recipes_ids):
+        """
+        Load ingredients of recipes again, replace changed recipes lists,
+        so searches running meanwhile use previous lists.
+        """
+        recipes_ingredients = defaultdict(list)
+        for ingredient_id, recipe_id in IngredientRecipe.objects.filter(
+            recipe_id__in=recipes_ids
+        ).values_list('ingredient_id', 'recipe_id').iterator():
+            recipes_ingredients[recipe_id].append(ingredient_id)
+        recipes = dict(self._recipes)
+        all_recipes_ingredients = dict(self._recipes_ingredients)
+        changed_recipes = defaultdict(list)
+        for recipe_id in recipes_ids:
+            for ingredient_id in all_recipes_ingredients.pop(recipe_id, ()):
+                changed_recipes[ingredient_id].append((recipe_id, False))
+            if recipe_id in recipes_ingredients:
+                all_recipes_ingredients[recipe_id] = (
+                    recipes_ingredients[recipe_id]
+                )
+                for ingredient_id in recipes_ingredients[recipe_id]:
+                    changed_recipes[ingredient_id].append((recipe_id, True))
+        for ingredient_id, changes in changed_recipes.items():
+            ingredient_recipes = array('q', recipes.get(ingredient_id, ()))
+            for recipe_id, added in changes:
+                position = bisect_left(ingredient_recipes, recipe_id)
+                found = (
+                    position < len(ingredient_recipes)
+                    and ingredient_recipes[position] == recipe_id
+                )
+                if found and not added:
+                    del ingredient_recipes[position]
+                elif added and not found:
+                    ingredient_recipes.insert(position, recipe_id)
+            if ingredient_recipes:
+                recipes[ingredient_id] = ingredient_recipes
+            else:
+                recipes.pop(ingredient_id, None)
+        self._recipes = recipes
+        self._recipes_ingredients = all_recipes_ingredients
+
+    def refresh(self):
+        """Rebuild index or load recipes changed since last refresh."""
+        version = get_cache_version(IngredientRecipe)
+        change_number = cache.get(INGREDIENT_RECIPE_CHANGES_KEY, 0)
+        if self._version != version or change_number < self._change_number:
+            self.build(version, change_number)
+            return
+        if change_number == self._change_number:
+            return
+        keys = [
+            f'{INGREDIENT_RECIPE_CHANGES_KEY}:{number}'
+            for number in range(self._change_number + 1, change_number + 1)
+        ]
+        changes = cache.get_many(keys)
+        if len(changes) != len(keys):
+            self.build(version, change_number)
+            return
+        self.update({
+            recipe_id
+            for recipes_ids in changes.values() for recipe_id in recipes_ids
+        })
+        self._change_number = change_number
+
+    def search(self, ingredients_ids, limit=None):
+        """
+        Return ids of recipes with any of ingredients
+        ordered by share of recipe ingredients found,
+        return all found recipes if limit is not passed.
+        """
+        with self._lock:
+            self.refresh()
+            recipes, recipes_ingredients = (
+                self._recipes, self._recipes_ingredients
+            )
+        found_counts = Counter()
+        for ingredient_id in set(ingredients_ids):
+            found_counts.update(recipes.get(ingredient_id, ()))
+        coverages = {
+            recipe_id: found_count / len(recipes_ingredients[recipe_id])
+            for recipe_id, found_count in found_counts.items()
+        }
+        if limit is None:
+            return sorted(coverages, key=coverages.__getitem__, reverse=True)
+        return heapq.nlargest(limit, coverages, key=coverages.__getitem__)
+
+
+ingredient_name_index = IngredientNameIndex()
+ingredient_recipe_index = IngredientRecipeIndex()
@@ -0,0 +1,277 @@
+import json
+import random
+import time
+from math import ceil
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import (
+    CaptureQueriesContext,
+    override_settings,
+    setup_test_environment,
+    teardown_test_environment,
+)
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from recipes.counters import update_counters
+from recipes.management.commands.import_csv import Command as ImportCommand
+from recipes.popularity import update_popularity
+from recipes.search import rebuild_search_index
+from recipes.utils import update_cache_version, update_tags_masks
+
+
+class Command(BaseCommand):
+    """
+    Fill test database with synthetic data and measure
+    latency and query count of API hot paths.
+    """
+
+    caches = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'benchmark',
+        }
+    }
+    tables = ImportCommand.tables
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--users', default=200, type=int, help='Number of users.'
+        )
+        parser.add_argument(
+            '--recipes', default=2000, type=int, help='Number of recipes.'
+        )
+        parser.add_argument(
+            '--ingredients',
+            default=2000,
+            type=int,
+            help='Number of ingredients.'
+        )
+        parser.add_argument(
+            '--tags', default=10, type=int, help='Number of tags.'
+        )
+        parser.add_argument(
+            '--recipe-ingredients',
+            default=8,
+            type=int,
+            help='Number of ingredients of each recipe.'
+        )
+        parser.add_argument(
+            '--user-relations',
+            default=20,
+            type=int,
+            help='Number of favorites, cart recipes and follows of each user.'
+        )
+        parser.add_argument(
+            '--repeat',
+            default=30,
+            type=int,
+            help='Number of timed requests to each endpoint.'
+        )
+        parser.add_argument(
+            '--seed', default=0, type=int, help='Random generator seed.'
+        )
+        parser.add_argument(
+            '--json',
+            action='store_true',
+            help='Write results as JSON.'
+        )
+
+    def handle(self, *args, **options):
+        """
+        Run benchmark in test database with process local cache,
+        so synthetic data is not cached for running application,
+        destroy test database afterwards.
+        """
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0)
+        try:
+            with override_settings(CACHES=self.caches):
+                self.create_data(options)
+                results = self.run_benchmark(options['repeat'])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+        if options['json']:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+        for name, result in results.items():
+            self.stdout.write(settings.BENCHMARK_RESULT.format(
+                name=name, **result
+            ))
+
+    def create_data(self, options):
+        """Create synthetic objects of import_csv models."""
+        start = time.perf_counter()
+        self.random = random.Random(options['seed'])
+        self.options = options
+        for table, model in self.tables.items():
+            model.objects.bulk_create(
+                getattr(self, f'get_{table}')(),
+                batch_size=settings.CSV_IMPORT_BATCH_SIZE
+            )
+        update_counters()
+        update_tags_masks()
+        rebuild_search_index()
+        update_popularity(full=True)
+        for model in self.tables.values():
+            update_cache_version(model)
+        if options['json']:
+            return
+        self.stdout.write(settings.BENCHMARK_DATA_CREATED.format(
+            recipes=options['recipes'],
+            seconds=time.perf_counter() - start,
+            users=options['users'],
+        ))
+
+    def get_related_pairs(self, count, related_count):
+        """Return random unique (id, related id) pairs for each id."""
+        per_object = min(self.options['user_relations'], related_count)
+        for object_id in range(1, count + 1):
+            for related_id in self.random.sample(
+                range(1, related_count + 1), per_object
+            ):
+                yield object_id, related_id
+
+    def get_ingredients(self):
+        """Return synthetic Ingredient instances."""
+        model = self.tables['ingredients']
+        for number in range(1, self.options['ingredients'] + 1):
+            yield model(name=f'ингредиент {number}', measurement_unit='г')
+
+    def get_tags(self):
+        """Return synthetic Tag instances."""
+        model = self.tables['tags']
+        for number in range(1, self.options['tags'] + 1):
+            yield model(
+                color=f'#{number:06x}',
+                name=f'тег {number}',
+                slug=f'tag{number}'
+            )
+
+    def get_users(self):
+        """Return synthetic User instances."""
+        model = self.tables['users']
+        password = make_password(None)
+        for number in range(1, self.options['users'] + 1):
+            yield model(
+                email=f'user{number}@example.com',
+                first_name='Имя',
+                last_name='Фамилия',
+                password=password,
+                username=f'user{number}',
+            )
+
+    def get_recipes(self):
+        """Return synthetic Recipe instances."""
+        model = self.tables['recipes']
+        for number in range(1, self.options['recipes'] + 1):
+            yield model(
+                author_id=self.random.randint(1, self.options['users']),
+                cooking_time=self.random.randint(1, 120),
+                image='recipes/images/benchmark.png',
+                name=f'Рецепт {number}',
+                text=f'Нарезать, смешать и запечь блюдо номер {number}',
+            )
+
+    def get_follows(self):
+        """Return synthetic Follow instances."""
+        model = self.tables['follows']
+        for user_id, author_id in self.get_related_pairs(
+            self.options['users'], self.options['users']
+        ):
+            if user_id != author_id:
+                yield model(following_author_id=author_id, user_id=user_id)
+
+    def get_favorites(self):
+        """Return synthetic Favorite instances."""
+        model = self.tables['favorites']
+        for user_id, recipe_id in self.get_related_pairs(
+            self.options['users'], self.options['recipes']
+        ):
+            yield model(recipe_id=recipe_id, user_id=user_id)
+
+    def get_ingredients_recipes(self):
+        """Return synthetic IngredientRecipe instances."""
+        model = self.tables['ingredients_recipes']
+        for recipe_id in range(1, self.options['recipes'] + 1):
+            for ingredient_id in self.random.sample(
+                range(1, self.options['ingredients'] + 1),
+                min(
+                    self.options['recipe_ingredients'],
+                    self.options['ingredients']
+                )
+            ):
+                yield model(
+                    amount=self.random.randint(1, 500),
+                    ingredient_id=ingredient_id,
+                    recipe_id=recipe_id,
+                )
+
+    def get_shopping_cart_recipes(self):
+        """Return synthetic ShoppingCartRecipe instances."""
+        model = self.tables['shopping_cart_recipes']
+        for user_id, recipe_id in self.get_related_pairs(
+            self.options['users'], self.options['recipes']
+        ):
+            yield model(recipe_id=recipe_id, user_id=user_id)
+
+    def get_tags_recipes(self):
+        """Return synthetic TagRecipe instances."""
+        model = self.tables['tags_recipes']
+        for recipe_id in range(1, self.options['recipes'] + 1):
+            for tag_id in self.random.sample(
+                range(1, self.options['tags'] + 1),
+                min(2, self.options['tags'])
+            ):
+                yield model(recipe_id=recipe_id, tag_id=tag_id)
+
+    def get_endpoints(self):
+        """
+        Return names and urls of benchmarked endpoints, {number} in url
+        is replaced by request number to bypass cached responses.
+        """
+        recipe_id = self.random.randint(1, self.options['recipes'])
+        return {
+            'recipes list': '/api/recipes/?limit=6',
+            'recipes list filtered': (
+                '/api/recipes/?limit=6&tags=tag1&tags=tag2&is_favorited=1'
+            ),
+            'recipes list popular': '/api/recipes/?limit=6&ordering=popular',
+            'recipes search': '/api/recipes/?limit=6&search=запечь',
+            'recipe detail': f'/api/recipes/{recipe_id}/',
+            'subscriptions': '/api/users/subscriptions/?recipes_limit=3',
+            'shopping cart download': '/api/recipes/download_shopping_cart/',
+            'ingredients search cached': (
+                '/api/ingredients/?name=ингредиент 1'
+            ),
+            'ingredients search': '/api/ingredients/?name=ингредиент {number}',
+        }
+
+    def run_benchmark(self, repeat):
+        """Return p50, p95 latency and query count of each endpoint."""
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION='Token {}'.format(
+            Token.objects.create(user_id=1).key
+        ))
+        results = {}
+        for name, url in self.get_endpoints().items():
+            durations = []
+            for number in range(1, max(repeat, 1) + 2):
+                with CaptureQueriesContext(connection) as queries:
+                    start = time.perf_counter()
+                    response = client.get(url.format(number=number))
+                    if response.streaming:
+                        b''.join(response.streaming_content)
+                    durations.append((time.perf_counter() - start) * 1000)
+            durations = sorted(durations[1:])
+            results[name] = {
+                'status': response.status_code,
+                'p50': durations[ceil(len(durations) * 0.5) - 1],
+                'p95': durations[ceil(len(durations) * 0.95) - 1],
+                'queries': len(queries),
+            }
+        return results
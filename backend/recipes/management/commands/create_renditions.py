@@ -0,0 +1,32 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from recipes.images import create_renditions
+from recipes.models import Recipe
+
+
+class Command(BaseCommand):
+    """Create missing renditions of recipes images."""
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--failed',
+            action='store_true',
+            help='Retry images which renditions were not created before.'
+        )
+
+    def handle(self, *args, **options):
+        recipes = Recipe.objects.filter(has_image_renditions__isnull=True)
+        if options['failed']:
+            recipes = Recipe.objects.exclude(has_image_renditions=True)
+        images_names = list(
+            recipes.exclude(image='').order_by().values_list(
+                'image', flat=True
+            ).distinct()
+        )
+        self.stdout.write(self.style.SUCCESS(
+            settings.RECIPE_IMAGE_RENDITIONS_SUCCESS.format(
+                count=sum(map(create_renditions, images_names)),
+                total=len(images_names)
+            )
+        ))
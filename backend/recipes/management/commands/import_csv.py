@@ -1,9 +1,15 @@
 import csv
+import io
+import time
+from itertools import islice
 
 from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, IntegrityError
 from django.db.transaction import atomic
-from django.core.management.base import BaseCommand
 
+from recipes.counters import update_counters
 from recipes.models import (
     Favorite,
     Ingredient,
@@ -13,6 +19,8 @@ from recipes.models import (
     Tag,
     TagRecipe,
 )
+from recipes.search import rebuild_search_index
+from recipes.utils import update_cache_version, update_tags_masks
 from users.models import Follow, User
 
 
@@ -31,79 +39,158 @@ class Command(BaseCommand):
         'shopping_cart_recipes': ShoppingCartRecipe,
         'tags_recipes': TagRecipe,
     }
+    related_fields = {
+        'recipes': {'author': User},
+        'follows': {'following_author': User, 'user': User},
+        'favorites': {'recipe': Recipe, 'user': User},
+        'ingredients_recipes': {'ingredient': Ingredient, 'recipe': Recipe},
+        'shopping_cart_recipes': {'recipe': Recipe, 'user': User},
+        'tags_recipes': {'recipe': Recipe, 'tag': Tag},
+    }
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            default=settings.CSV_IMPORT_BATCH_SIZE,
+            type=int,
+            help='Number of objects saved by one INSERT or COPY query.'
+        )
+        parser.add_argument(
+            '--copy',
+            action='store_true',
+            help='Load tables with PostgreSQL COPY FROM STDIN.'
+        )
 
     def handle(self, *args, **options):
-        """Extract data from .csv file and call create_object func."""
+        """Read data from .csv files and call create_objects func."""
+        self.related_ids = {}
+        create_objects = self.create_objects
+        if options['copy']:
+            if connection.vendor != 'postgresql':
+                raise CommandError(settings.CSV_IMPORT_COPY_POSTGRESQL_ONLY)
+            create_objects = self.copy_objects
         for table in self.tables:
             file_path = f'{self.csv_path}/{table}.csv'
             try:
-                with open(file_path, mode="r", encoding="utf-8") as csvfile:
-                    csv_data = [row for row in csv.DictReader(csvfile)]
+                csvfile = open(file_path, mode="r", encoding="utf-8")
             except FileNotFoundError:
                 raise FileExistsError(f'Ошибка {file_path} не найден')
-            else:
-                self.create_object(
-                    cls=self.tables[table], csv_data=csv_data, table=table,
+            with csvfile:
+                create_objects(
+                    cls=self.tables[table],
+                    csv_data=csv.DictReader(csvfile),
+                    table=table,
+                    batch_size=options['batch_size'],
                 )
+        update_counters()
+        update_tags_masks()
+        rebuild_search_index()
+        for model in self.tables.values():
+            update_cache_version(model)
 
-    @atomic
-    def create_object(self, cls, csv_data, table):
-        """Create objects with data from .csv file."""
-        self.print_info(name=table)
-        for obj_data in csv_data:
-
-            if table in ['ingredients', 'tags', 'users']:
-                cls.objects.create(**obj_data).save()
+    def get_related_ids(self, model):
+        """Return set of existing model ids, load it once per model."""
+        if model not in self.related_ids:
+            self.related_ids[model] = set(
+                model.objects.values_list('id', flat=True)
+            )
+        return self.related_ids[model]
 
-            elif table == 'recipes':
-                Recipe.objects.create(
-                    author=User.objects.get(
-                        id=int(obj_data.get('author'))
-                    ),
-                    cooking_time=obj_data.get('cooking_time'),
-                    image=obj_data.get('image'),
-                    name=obj_data.get('name'),
-                    text=obj_data.get('text'),
-                ).save()
-
-            elif table == 'follows':
-                Follow.objects.create(
-                    following_author=User.objects.get(
-                        id=int(obj_data.get('following_author'))
-                    ),
-                    user=User.objects.get(id=int(obj_data.get('user'))),
-                ).save()
+    def get_object_data(self, obj_data, table, check_related=True):
+        """Replace related objects ids from .csv file with *_id fields."""
+        for field, model in self.related_fields.get(table, {}).items():
+            related_id = int(obj_data.pop(field))
+            if check_related and related_id not in self.get_related_ids(
+                model
+            ):
+                raise CommandError(
+                    settings.CSV_IMPORT_RELATED_OBJECT_NOT_FOUND.format(
+                        field_name=field, id=related_id, filename=table
+                    )
+                )
+            obj_data[f'{field}_id'] = related_id
+        return obj_data
 
-            elif table == 'favorites' or table == 'shopping_cart_recipes':
-                cls.objects.create(
-                    recipe=Recipe.objects.get(
-                        id=int(obj_data.get('recipe'))
-                    ),
-                    user=User.objects.get(id=int(obj_data.get('user')))
-                ).save()
+    @atomic
+    def create_objects(self, cls, csv_data, table, batch_size):
+        """Create objects with data from .csv file by batches."""
+        self.print_info(name=table)
+        started_at = time.monotonic()
+        objs = (
+            cls(**self.get_object_data(obj_data, table))
+            for obj_data in csv_data
+        )
+        obj_count = 0
+        while batch := list(islice(objs, batch_size)):
+            cls.objects.bulk_create(batch)
+            obj_count += len(batch)
+        self.print_info(
+            name=table,
+            obj_count=obj_count,
+            seconds=time.monotonic() - started_at
+        )
 
-            elif table == 'ingredients_recipes':
-                IngredientRecipe.objects.create(
-                    amount=int(obj_data.get('amount')),
-                    ingredient=Ingredient.objects.get(
-                        id=int(obj_data.get('ingredient'))
-                    ),
-                    recipe=Recipe.objects.get(
-                        id=int(obj_data.get('recipe'))
-                    ),
-                ).save()
+    @staticmethod
+    def get_copy_value(value):
+        """Return quoted COPY csv value, unquoted empty string for NULL."""
+        if value is None:
+            return ''
+        return '"{}"'.format(str(value).replace('"', '""'))
 
-            elif table == 'tags_recipes':
-                TagRecipe.objects.create(
-                    recipe=Recipe.objects.get(
-                        id=int(obj_data.get('recipe'))
-                    ),
-                    tag=Tag.objects.get(id=int(obj_data.get('tag')))
-                ).save()
+    def copy_objects(self, cls, csv_data, table, batch_size):
+        """
+        Load objects with data from .csv file by COPY FROM STDIN.
 
-        self.print_info(name=table, obj_count=len(csv_data))
+        Foreign keys are checked by database, table sequences are reset
+        after loading.
+        """
+        self.print_info(name=table)
+        started_at = time.monotonic()
+        fields = [
+            field for field in cls._meta.concrete_fields
+            if not field.primary_key
+        ]
+        copy_sql = 'COPY {table} ({columns}) FROM STDIN (FORMAT csv)'.format(
+            table=connection.ops.quote_name(cls._meta.db_table),
+            columns=', '.join(
+                connection.ops.quote_name(field.column) for field in fields
+            )
+        )
+        objs = (
+            cls(**self.get_object_data(obj_data, table, check_related=False))
+            for obj_data in csv_data
+        )
+        obj_count = 0
+        try:
+            with atomic(), connection.cursor() as cursor:
+                while batch := list(islice(objs, batch_size)):
+                    buffer = io.StringIO()
+                    buffer.writelines(
+                        ','.join(
+                            self.get_copy_value(field.get_db_prep_save(
+                                field.pre_save(obj, add=True), connection
+                            ))
+                            for field in fields
+                        ) + '\n'
+                        for obj in batch
+                    )
+                    buffer.seek(0)
+                    cursor.copy_expert(copy_sql, buffer)
+                    obj_count += len(batch)
+                connection.check_constraints(table_names=[cls._meta.db_table])
+                for sql in connection.ops.sequence_reset_sql(
+                    no_style(), [cls]
+                ):
+                    cursor.execute(sql)
+        except IntegrityError as error:
+            raise CommandError(error)
+        self.print_info(
+            name=table,
+            obj_count=obj_count,
+            seconds=time.monotonic() - started_at
+        )
 
-    def print_info(self, name, obj_count=None):
+    def print_info(self, name, obj_count=None, seconds=None):
         """Print process and success import message."""
         if obj_count is None:
             self.stdout.write(self.style.NOTICE(
@@ -112,6 +199,9 @@ class Command(BaseCommand):
         else:
             self.stdout.write(self.style.SUCCESS(
                 settings.CSV_IMPORT_SUCCESS.format(
-                    count=obj_count, filename=name
+                    count=obj_count,
+                    filename=name,
+                    seconds=seconds,
+                    speed=obj_count / seconds if seconds else obj_count
                 )
             ))
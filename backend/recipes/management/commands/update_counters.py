@@ -0,0 +1,13 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from recipes.counters import update_counters
+
+
+class Command(BaseCommand):
+    """Recount favorites, shopping cart, recipes, subscribers counters."""
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.SUCCESS(
+            settings.COUNTERS_UPDATE_SUCCESS.format(count=update_counters())
+        ))
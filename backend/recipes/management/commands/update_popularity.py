@@ -0,0 +1,22 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from recipes.popularity import update_popularity
+
+
+class Command(BaseCommand):
+    """Recount popularity scores of recipes, run it periodically."""
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Recount scores of all recipes.'
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.SUCCESS(
+            settings.POPULARITY_UPDATE_SUCCESS.format(
+                count=update_popularity(options['full'])
+            )
+        ))
@@ -0,0 +1,39 @@
+from django.db import migrations
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+COUNTERS = (
+    ('recipes.Recipe', 'favorites_count', 'recipes.Favorite', 'recipe'),
+    (
+        'recipes.Recipe',
+        'shopping_cart_count',
+        'recipes.ShoppingCartRecipe',
+        'recipe'
+    ),
+    ('users.User', 'recipes_count', 'recipes.Recipe', 'author'),
+    ('users.User', 'subscribers_count', 'users.Follow', 'following_author'),
+)
+
+
+def fill_counters(apps, schema_editor):
+    for model, field_name, counted_model, related_field in COUNTERS:
+        model = apps.get_model(model)
+        model.objects.update(**{field_name: Coalesce(Subquery(
+            apps.get_model(counted_model).objects.filter(
+                **{related_field: OuterRef('pk')}
+            ).order_by().values(related_field).annotate(
+                count=Count('pk')
+            ).values('count')
+        ), 0)})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0010_auto_20261018_0640'),
+        ('users', '0004_auto_20261018_0640'),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
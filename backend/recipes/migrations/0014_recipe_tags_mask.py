@@ -0,0 +1,41 @@
+# Generated by Django 3.2.3 on 2026-10-18 03:47
+
+from collections import defaultdict
+
+from django.db import migrations, models
+
+TAGS_MASK_MAX_TAG_ID = 63
+
+
+def fill_tags_masks(apps, schema_editor):
+    recipe_model = apps.get_model('recipes', 'Recipe')
+    tags_masks = defaultdict(int)
+    for recipe_id, tag_id in apps.get_model(
+        'recipes', 'TagRecipe'
+    ).objects.values_list('recipe_id', 'tag_id').iterator():
+        if tag_id <= TAGS_MASK_MAX_TAG_ID:
+            tags_masks[recipe_id] |= 1 << (tag_id - 1)
+    recipe_model.objects.bulk_update(
+        [
+            recipe_model(id=recipe_id, tags_mask=tags_mask)
+            for recipe_id, tags_mask in tags_masks.items()
+        ],
+        ['tags_mask'],
+        batch_size=5000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0013_recipe_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='tags_mask',
+            field=models.BigIntegerField(default=0, editable=False, verbose_name='Битовая маска тегов'),
+        ),
+        migrations.RunPython(fill_tags_masks, migrations.RunPython.noop),
+    ]
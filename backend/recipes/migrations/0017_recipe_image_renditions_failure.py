@@ -0,0 +1,27 @@
+# Generated by Django 3.2.3 on 2026-10-18 04:26
+
+from django.db import migrations, models
+
+
+def mark_renditions_not_created(apps, schema_editor):
+    apps.get_model('recipes', 'Recipe').objects.filter(
+        has_image_renditions=False
+    ).update(has_image_renditions=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0016_created_at_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='recipe',
+            name='has_image_renditions',
+            field=models.BooleanField(default=None, editable=False, help_text='Пусто, пока копии не созданы, нет, если создать не удалось', null=True, verbose_name='Уменьшенные копии картинки созданы'),
+        ),
+        migrations.RunPython(
+            mark_renditions_not_created, migrations.RunPython.noop
+        ),
+    ]
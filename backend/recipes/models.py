@@ -1,5 +1,6 @@
 from colorfield.fields import ColorField
 from django.conf import settings
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 
 from recipes.validators import (
@@ -81,6 +82,16 @@ class Recipe(models.Model):
         validators=[validate_cooking_time]
     )
     created_at = models.DateTimeField('Дата публикации', auto_now_add=True)
+    favorites_count = models.PositiveIntegerField(
+        'Количество добавлений в избранное', default=0, editable=False
+    )
+    has_image_renditions = models.BooleanField(
+        'Уменьшенные копии картинки созданы',
+        default=None,
+        editable=False,
+        help_text='Пусто, пока копии не созданы, нет, если создать не удалось',
+        null=True
+    )
     image = models.ImageField('Картинка', upload_to='recipes/images/')
     name = models.CharField(
         'Название', db_index=True, max_length=settings.RECIPE_NAME_MAX_LENGTH
@@ -90,13 +101,27 @@ class Recipe(models.Model):
         through='IngredientRecipe',
         verbose_name='Список ингредиентов'
     )
+    search_vector = SearchVectorField(
+        'Поисковый вектор', editable=False, null=True
+    )
+    shopping_cart_count = models.PositiveIntegerField(
+        'Количество добавлений в список покупок', default=0, editable=False
+    )
     tags = models.ManyToManyField(
         Tag, through='TagRecipe', verbose_name='Теги'
     )
+    tags_mask = models.BigIntegerField(
+        'Битовая маска тегов', default=0, editable=False
+    )
     text = models.TextField('Описание')
 
     class Meta:
         default_related_name = 'recipes'
+        indexes = [
+            models.Index(
+                fields=['-created_at', '-id'], name='recipe_created_at_id_idx'
+            )
+        ]
         ordering = ('-created_at', 'name')
         verbose_name = 'рецепт'
         verbose_name_plural = 'Рецепты'
@@ -106,6 +131,37 @@ class Recipe(models.Model):
         return f'Рецепт: {self.name}'
 
 
+class RecipePopularity(models.Model):
+    """Describe precomputed popularity score of recipe."""
+
+    recipe = models.OneToOneField(
+        Recipe,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='popularity',
+        verbose_name='Рецепт'
+    )
+    score = models.FloatField(
+        'Рейтинг популярности', db_index=True, null=True
+    )
+    favorites_count = models.PositiveIntegerField(
+        'Учтено добавлений в избранное'
+    )
+    shopping_cart_count = models.PositiveIntegerField(
+        'Учтено добавлений в список покупок'
+    )
+    updated_at = models.DateTimeField('Дата обновления')
+
+    class Meta:
+        ordering = ('-score',)
+        verbose_name = 'популярность рецепта'
+        verbose_name_plural = 'Популярность рецептов'
+
+    def __str__(self):
+        """Return instance text representation."""
+        return f'Популярность рецепта: {self.recipe}'
+
+
 class IngredientRecipe(models.Model):
     """Linked model for ingredient - recipe relation."""
 
@@ -163,7 +219,9 @@ class TagRecipe(models.Model):
 class CreateTimeRecipeUserModel(models.Model):
     """Describe created_at, recipe-related, user-related fields."""
 
-    created_at = models.DateTimeField('Дата добавления', auto_now_add=True)
+    created_at = models.DateTimeField(
+        'Дата добавления', auto_now_add=True, db_index=True
+    )
     recipe = models.ForeignKey(
         Recipe, on_delete=models.CASCADE, verbose_name='Рецепт'
     )
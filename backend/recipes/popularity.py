@@ -0,0 +1,92 @@
+import math
+from collections import defaultdict
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.db.models import F, Max, Q
+from django.db.transaction import atomic
+from django.utils.timezone import now
+
+from recipes.models import (
+    Favorite, Recipe, RecipePopularity, ShoppingCartRecipe
+)
+
+SCORE_EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def get_event_score(created_at, weight):
+    """
+    Return log2 score of favorite or shopping cart adding.
+
+    Score weight doubles every half-life period after epoch, so older
+    events weigh less and stored scores stay comparable without decay.
+    """
+    return math.log2(weight) + (created_at - SCORE_EPOCH).total_seconds() / (
+        settings.POPULARITY_HALF_LIFE_DAYS * 24 * 60 * 60
+    )
+
+
+def get_total_score(scores):
+    """Return log2 of sum of weights for log2 scores, None for no scores."""
+    if not scores:
+        return None
+    max_score = max(scores)
+    return max_score + math.log2(
+        sum(2 ** (score - max_score) for score in scores)
+    )
+
+
+def get_stale_recipes_ids(full=False):
+    """
+    Return ids of recipes without score, with new favorites or
+    shopping cart recipes since last update or with deleted ones.
+    """
+    if full:
+        return set(Recipe.objects.values_list('id', flat=True))
+    last_update = RecipePopularity.objects.aggregate(
+        last_update=Max('updated_at')
+    )['last_update']
+    stale_recipes_ids = set(Recipe.objects.filter(
+        Q(popularity__isnull=True)
+        | ~Q(popularity__favorites_count=F('favorites_count'))
+        | ~Q(popularity__shopping_cart_count=F('shopping_cart_count'))
+    ).values_list('id', flat=True))
+    if last_update is not None:
+        stale_recipes_ids.update(
+            Favorite.objects.filter(created_at__gt=last_update).values_list(
+                'recipe_id', flat=True
+            ).union(ShoppingCartRecipe.objects.filter(
+                created_at__gt=last_update
+            ).values_list('recipe_id', flat=True))
+        )
+    return stale_recipes_ids
+
+
+@atomic
+def update_popularity(full=False):
+    """Recount popularity scores of stale recipes, return their count."""
+    updated_at = now()
+    recipes_ids = get_stale_recipes_ids(full)
+    scores = defaultdict(list)
+    counts = defaultdict(lambda: [0, 0])
+    for position, (model, weight) in enumerate((
+        (Favorite, settings.POPULARITY_FAVORITE_WEIGHT),
+        (ShoppingCartRecipe, settings.POPULARITY_SHOPPING_CART_WEIGHT),
+    )):
+        for recipe_id, created_at in model.objects.filter(
+            recipe_id__in=recipes_ids
+        ).values_list('recipe_id', 'created_at').iterator():
+            scores[recipe_id].append(get_event_score(created_at, weight))
+            counts[recipe_id][position] += 1
+    RecipePopularity.objects.filter(recipe_id__in=recipes_ids).delete()
+    RecipePopularity.objects.bulk_create(
+        RecipePopularity(
+            recipe_id=recipe_id,
+            score=get_total_score(scores[recipe_id]),
+            favorites_count=counts[recipe_id][0],
+            shopping_cart_count=counts[recipe_id][1],
+            updated_at=updated_at
+        )
+        for recipe_id in recipes_ids
+    )
+    return len(recipes_ids)
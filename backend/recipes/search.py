@@ -0,0 +1,119 @@
+import re
+
+from django.conf import settings
+from django.contrib.postgres.search import (
+    SearchQuery, SearchRank, SearchVector
+)
+from django.db import connection
+from django.db.models import F, Q
+from django.db.models.expressions import RawSQL
+
+from recipes.models import Recipe
+
+FTS_TABLE = 'recipes_recipe_fts'
+WORD_ENDINGS = 'аеиийоуыьэюя'
+
+
+def get_search_vector():
+    """Return weighted PostgreSQL search vector of recipe name and text."""
+    return SearchVector(
+        'name', weight='A', config=settings.SEARCH_CONFIG
+    ) + SearchVector('text', weight='B', config=settings.SEARCH_CONFIG)
+
+
+def normalize_text(text: str):
+    """Replace ё letter, SQLite FTS5 does not fold it."""
+    return text.replace('ё', 'е').replace('Ё', 'Е')
+
+
+def get_fts_query(value: str):
+    """
+    Return SQLite FTS5 prefix query for words of value.
+
+    Word endings are trimmed to match other word forms,
+    FTS5 has no russian stemmer.
+    """
+    words = re.findall(r'\w+', normalize_text(value).lower())
+    return ' '.join(
+        '"{}"*'.format(
+            word.rstrip(WORD_ENDINGS) if len(word.rstrip(WORD_ENDINGS)) > 2
+            else word
+        )
+        for word in words
+    )
+
+
+def update_search_index(recipe):
+    """Update search index data of recipe."""
+    if connection.vendor == 'postgresql':
+        Recipe.objects.filter(pk=recipe.pk).update(
+            search_vector=get_search_vector()
+        )
+    elif connection.vendor == 'sqlite':
+        delete_from_search_index([recipe.pk])
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {FTS_TABLE} (rowid, name, text) '
+                'VALUES (%s, %s, %s)',
+                [
+                    recipe.pk,
+                    normalize_text(recipe.name),
+                    normalize_text(recipe.text)
+                ]
+            )
+
+
+def delete_from_search_index(recipes_ids):
+    """Delete recipes from SQLite search index."""
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {FTS_TABLE} WHERE rowid IN '
+                f'({", ".join(["%s"] * len(recipes_ids))})',
+                list(recipes_ids)
+            )
+
+
+def rebuild_search_index():
+    """Fill search index with data of all recipes."""
+    if connection.vendor == 'postgresql':
+        Recipe.objects.update(search_vector=get_search_vector())
+    elif connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+            cursor.executemany(
+                f'INSERT INTO {FTS_TABLE} (rowid, name, text) '
+                'VALUES (%s, %s, %s)',
+                [
+                    (recipe_id, normalize_text(name), normalize_text(text))
+                    for recipe_id, name, text in Recipe.objects.values_list(
+                        'id', 'name', 'text'
+                    ).order_by().iterator()
+                ]
+            )
+
+
+def search_recipes(queryset, value: str):
+    """Filter recipes by name and text words, order them by rank."""
+    ordering = queryset.model._meta.ordering
+    if connection.vendor == 'postgresql':
+        query = SearchQuery(
+            value, config=settings.SEARCH_CONFIG, search_type='websearch'
+        )
+        return queryset.filter(search_vector=query).annotate(
+            search_rank=SearchRank(F('search_vector'), query)
+        ).order_by('-search_rank', *ordering)
+    if connection.vendor == 'sqlite':
+        fts_query = get_fts_query(value)
+        if not fts_query:
+            return queryset
+        return queryset.filter(id__in=RawSQL(
+            f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s',
+            [fts_query]
+        )).annotate(search_rank=RawSQL(
+            f'SELECT bm25({FTS_TABLE}, 10.0, 1.0) FROM {FTS_TABLE} '
+            f'WHERE {FTS_TABLE} MATCH %s '
+            f'AND rowid = {queryset.model._meta.db_table}.id',
+            [fts_query]
+        )).order_by('search_rank', *ordering)
+    return queryset.filter(Q(name__icontains=value) | Q(text__icontains=value))
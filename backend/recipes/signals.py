@@ -0,0 +1,130 @@
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from recipes.counters import (
+    change_counters,
+    deleted_authors_ids,
+    update_counters,
+)
+from recipes.indexes import record_recipes_changes
+from recipes.models import (
+    Favorite,
+    Ingredient,
+    IngredientRecipe,
+    Recipe,
+    ShoppingCartRecipe,
+    Tag,
+)
+from recipes.search import delete_from_search_index, update_search_index
+from recipes.utils import get_tags_mask, update_cache_version
+from users.models import Follow, User
+
+
+@receiver(post_delete, sender=Ingredient)
+@receiver(post_save, sender=Ingredient)
+@receiver(post_delete, sender=Tag)
+@receiver(post_save, sender=Tag)
+def invalidate_cached_responses(sender, **kwargs):
+    """Change cache version after Ingredient, Tag changes."""
+    update_cache_version(sender)
+
+
+@receiver(pre_delete, sender=Ingredient)
+def save_ingredient_recipes_ids(sender, instance, **kwargs):
+    """Save ids of recipes with ingredient before Ingredient deletion."""
+    instance.recipes_ids = list(
+        IngredientRecipe.objects.filter(ingredient=instance).values_list(
+            'recipe_id', flat=True
+        )
+    )
+
+
+@receiver(post_delete, sender=Ingredient)
+def record_ingredient_recipes_changes(sender, instance, **kwargs):
+    """Record changes of recipes with ingredient after its deletion."""
+    record_recipes_changes(instance.recipes_ids)
+
+
+@receiver(post_delete, sender=Tag)
+def delete_tag_from_tags_masks(sender, instance, **kwargs):
+    """Reset deleted tag bit of recipes tags bitmasks."""
+    tag_mask = get_tags_mask([instance.id])
+    if tag_mask:
+        Recipe.objects.alias(
+            tag_match=F('tags_mask').bitand(tag_mask)
+        ).exclude(tag_match=0).update(
+            tags_mask=F('tags_mask').bitand(~tag_mask)
+        )
+
+
+@receiver(post_save, sender=Favorite)
+@receiver(post_save, sender=Follow)
+@receiver(post_save, sender=Recipe)
+@receiver(post_save, sender=ShoppingCartRecipe)
+def increase_counters(sender, instance, created, **kwargs):
+    """
+    Increase counters after Favorite, Follow, Recipe creation,
+    deletions change counters explicitly to keep cascades fast.
+    """
+    if created:
+        change_counters(instance, 1)
+
+
+@receiver(post_save, sender=Recipe)
+def update_recipe_search_index(sender, instance, **kwargs):
+    """Update search index after Recipe saving."""
+    update_search_index(instance)
+
+
+@receiver(post_delete, sender=Recipe)
+def delete_recipe_from_counters_search_index(sender, instance, **kwargs):
+    """
+    Decrease author recipes counter, delete Recipe from search
+    and ingredient recipe indexes after its deletion,
+    skip it if author is deleted in current context.
+    """
+    if instance.author_id in deleted_authors_ids.get():
+        return
+    change_counters(instance, -1)
+    delete_from_search_index([instance.pk])
+    record_recipes_changes([instance.pk])
+
+
+@receiver(pre_delete, sender=User)
+def save_user_related_ids(sender, instance, **kwargs):
+    """
+    Save ids of recipes and authors which counters count user rows
+    and ids of user recipes before user deletion.
+    """
+    instance.counted_related_ids = {
+        'recipes.Recipe': (
+            set(Favorite.objects.filter(user=instance).values_list(
+                'recipe_id', flat=True
+            ))
+            | set(ShoppingCartRecipe.objects.filter(user=instance).values_list(
+                'recipe_id', flat=True
+            ))
+        ),
+        'users.User': set(Follow.objects.filter(user=instance).values_list(
+            'following_author_id', flat=True
+        )),
+    }
+    instance.deleted_recipes_ids = list(
+        Recipe.objects.filter(author=instance).values_list('id', flat=True)
+    )
+
+
+@receiver(post_delete, sender=User)
+def update_user_related_counters(sender, instance, **kwargs):
+    """
+    Recount counters of objects related to user rows once,
+    delete user recipes from search and ingredient recipe indexes
+    after user deletion.
+    """
+    for model, pks in instance.counted_related_ids.items():
+        if pks:
+            update_counters(model=model, pks=pks)
+    if instance.deleted_recipes_ids:
+        delete_from_search_index(instance.deleted_recipes_ids)
+        record_recipes_changes(instance.deleted_recipes_ids)
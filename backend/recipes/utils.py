@@ -1,6 +1,63 @@
 import random
+import time
+from collections import defaultdict
+
+from django.apps import apps as global_apps
+from django.conf import settings
+from django.core.cache import cache
 
 
 def get_random_hex_code():
     """Generate random color hex code."""
     return '#%06x' % random.randint(0, 0xFFFFFF)
+
+
+def get_cache_version_key(model):
+    """Return cache key of model instances cache version."""
+    return f'{model._meta.label_lower}:cache_version'
+
+
+def get_cache_version(model):
+    """Return current cache version of model instances."""
+    return cache.get_or_set(get_cache_version_key(model), time.time_ns, None)
+
+
+def update_cache_version(model):
+    """Set new cache version of model instances."""
+    cache.set(get_cache_version_key(model), time.time_ns(), None)
+
+
+def get_tags_mask(tags_ids):
+    """Return recipe tags bitmask, tag with id N sets bit N - 1."""
+    mask = 0
+    for tag_id in tags_ids:
+        if tag_id <= settings.TAGS_MASK_MAX_TAG_ID:
+            mask |= 1 << (tag_id - 1)
+    return mask
+
+
+def update_tags_masks(recipes_ids=None, apps=global_apps):
+    """Set recipes tags bitmasks by TagRecipe rows."""
+    recipe_model = apps.get_model('recipes', 'Recipe')
+    tags_recipes = apps.get_model('recipes', 'TagRecipe').objects.all()
+    recipes = recipe_model.objects.all()
+    if recipes_ids is not None:
+        tags_recipes = tags_recipes.filter(recipe_id__in=recipes_ids)
+        recipes = recipes.filter(id__in=recipes_ids)
+    recipes_tags = defaultdict(list)
+    for recipe_id, tag_id in tags_recipes.values_list('recipe_id', 'tag_id'):
+        recipes_tags[recipe_id].append(tag_id)
+    recipe_model.objects.bulk_update(
+        [
+            recipe_model(id=recipe_id, tags_mask=tags_mask)
+            for recipe_id, tags_mask, old_tags_mask in (
+                (recipe_id, get_tags_mask(recipes_tags[recipe_id]), mask)
+                for recipe_id, mask in recipes.values_list(
+                    'id', 'tags_mask'
+                ).order_by().iterator()
+            )
+            if tags_mask != old_tags_mask
+        ],
+        ['tags_mask'],
+        batch_size=settings.CSV_IMPORT_BATCH_SIZE
+    )
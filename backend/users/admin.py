@@ -2,6 +2,8 @@ from django.conf import settings
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 
+from recipes.admin import CountersAdminMixin
+from recipes.counters import deleting_authors, update_counters
 from users.models import Follow, User
 
 
@@ -12,7 +14,7 @@ class FollowInline(admin.StackedInline):
 
 
 @admin.register(Follow)
-class FollowAdmin(admin.ModelAdmin):
+class FollowAdmin(CountersAdminMixin, admin.ModelAdmin):
     list_display = ('user', 'following_author', 'created_at',)
     list_editable = ('following_author',)
     list_filter = ('user__username', 'following_author__username')
@@ -32,5 +34,13 @@ class UserAdmin(BaseUserAdmin):
     list_filter = ('username', 'email', 'is_active', 'is_staff',)
     search_fields = ('username', 'email')
 
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        update_counters(model='users.User', pks=[form.instance.pk])
+
+    def delete_queryset(self, request, queryset):
+        with deleting_authors(queryset.values_list('id', flat=True)):
+            super().delete_queryset(request, queryset)
+
 
 admin.site.empty_value_display = settings.ADMIN_SITE_EMPTY_VALUE
@@ -4,6 +4,7 @@ from django.contrib.auth.password_validation import validate_password
 from django.contrib.auth.validators import UnicodeUsernameValidator
 from django.db import models
 
+from recipes.counters import deleting_authors
 from users.validators import check_username_for_me_value
 
 
@@ -29,6 +30,12 @@ class User(AbstractUser):
         max_length=settings.PASSWORD_FIELD_MAX_LENGTH,
         validators=[validate_password]
     )
+    recipes_count = models.PositiveIntegerField(
+        'Количество рецептов', default=0, editable=False
+    )
+    subscribers_count = models.PositiveIntegerField(
+        'Количество подписчиков', default=0, editable=False
+    )
     username = models.CharField(
         'Логин',
         db_index=True,
@@ -51,6 +58,11 @@ class User(AbstractUser):
         return (f'Пользователь {self.username}'
                 f' Имя: {self.first_name} Фамилия: {self.last_name}')
 
+    def delete(self, *args, **kwargs):
+        """Delete user, update recipes counters and indexes once."""
+        with deleting_authors([self.pk]):
+            return super().delete(*args, **kwargs)
+
 
 class Follow(models.Model):
     """Describe author subscriptions of users."""